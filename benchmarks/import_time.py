@@ -0,0 +1,101 @@
+"""
+Import-time budget of the pipeline.
+
+Imports openfinance and builds a parser in a fresh interpreter with
+``python -X importtime``, prints the slowest modules and fails if the
+total time exceeds the budget or a heavy dependency was loaded eagerly.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --budget-ms 300 --top 20
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+# Modules that must only be imported when they are actually used
+HEAVY_MODULES = ["pandas", "numpy", "boto3", "botocore", "PyPDF2", "dotenv"]
+
+COLD_START = """
+import tempfile
+import openfinance.pipeline
+import openfinance.batch
+from openfinance.parser.textract.parser import FinancialStatementTextractParser
+
+with tempfile.TemporaryDirectory() as temp_folder:
+    parser = FinancialStatementTextractParser(
+        input_path="statement.pdf",
+        password=None,
+        bank_name="Itau",
+        temp_folder=temp_folder,
+        output_folder=temp_folder,
+        max_workers=8)
+    parser.cleanup()
+"""
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def measure_imports(code: str) -> dict:
+    """
+    Run code in a new interpreter with -X importtime.
+
+    Returns:
+        dict: Cumulative import time in microseconds and nesting
+            depth of each module
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", code],
+        cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+
+    timings = {}
+    for line in result.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        # import time: <self us> | <cumulative us> | <indented module>
+        fields = line[len("import time:"):].split("|")
+        module = fields[2].strip()
+        depth = (len(fields[2]) - len(fields[2].lstrip()) - 1) // 2
+        timings[module] = (int(fields[1]), depth)
+    return timings
+
+
+def total_ms(timings: dict) -> float:
+    """Sum the cumulative time of the openfinance top-level imports."""
+    return sum(microseconds for module, (microseconds, depth)
+               in timings.items()
+               if depth == 0 and module.startswith("openfinance")) / 1000
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--budget-ms", type=float, default=250,
+        help="Maximum import time of the pipeline in milliseconds")
+    parser.add_argument(
+        "--top", type=int, default=15,
+        help="Number of slowest modules to print")
+    args = parser.parse_args(argv)
+
+    timings = measure_imports(COLD_START)
+    slowest = sorted(timings.items(), key=lambda item: -item[1][0])
+    for module, (microseconds, _) in slowest[:args.top]:
+        print(f"{microseconds / 1000:9.1f} ms  {module}")
+
+    elapsed = total_ms(timings)
+    print(f"\nopenfinance import time: {elapsed:.1f} ms "
+          f"(budget {args.budget_ms:.0f} ms)")
+
+    loaded = [module for module in HEAVY_MODULES if module in timings]
+    if loaded:
+        print(f"FAIL: heavy modules imported eagerly: {', '.join(loaded)}")
+    if elapsed > args.budget_ms:
+        print("FAIL: import time over budget")
+    return 1 if loaded or elapsed > args.budget_ms else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,119 @@
+"""
+Memory benchmark of the preprocessors.
+
+Preprocesses a synthetic Nu statement history in a fresh interpreter,
+once in the default mode and once with low_memory=True, and prints the
+peak and retained RSS of the preprocessing per 100k transactions. The
+peak is measured from the tables already in memory, so building them
+does not count.
+
+Usage:
+    python benchmarks/memory.py
+    python benchmarks/memory.py --rows 500000
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+PREPROCESS = """
+import json, os, resource, sys, tempfile
+import numpy as np
+import pandas as pd
+sys.path.insert(0, "benchmarks")
+from parsing import make_columns
+from openfinance.parser.processors.nu_bank import (
+    CreditCardNuBankStatementPreprocessor)
+
+ROWS, LOW_MEMORY, PAGE_ROWS = {rows}, {low_memory}, 30
+
+
+def rss_mb(field):
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith(field):
+                return int(line.split()[1]) / 1024
+
+
+columns = make_columns(ROWS)
+merchants = np.array([f"COMERCIO {{i}}" for i in range(500)], dtype=object)
+history = pd.DataFrame({{
+    "Fecha": columns["nu_dates"],
+    "Descripción": merchants[np.arange(ROWS) % len(merchants)],
+    "Valor": columns["commission"],
+    "Cuotas": columns["installments"],
+    "Valor del mes": columns["money"],
+    "Interés Porcentaje": columns["percent"],
+    "del mes y valor": columns["money"],
+    "Total a pagar este mes": columns["commission"],
+    "Restante por pagar": columns["money"],
+}}).astype(str)
+tables = [history.iloc[i:i + PAGE_ROWS].copy()
+          for i in range(0, ROWS, PAGE_ROWS)]
+del columns, history
+
+# Reset the peak RSS (VmHWM) so only the preprocessing is measured
+with open("/proc/self/clear_refs", "w") as clear_refs:
+    clear_refs.write("5")
+baseline = rss_mb("VmRSS")
+
+with tempfile.TemporaryDirectory() as output_folder:
+    preprocessor = CreditCardNuBankStatementPreprocessor(
+        input_path="history.pdf",
+        csv_files=None,
+        output_folder=output_folder,
+        tables=tables,
+        low_memory=LOW_MEMORY)
+    del tables
+    preprocessor.process_financial_statement()
+    rows = len(preprocessor.processed_df)
+
+print(json.dumps({{
+    "rows": rows,
+    "peak_mb": rss_mb("VmHWM") - baseline,
+    "retained_mb": rss_mb("VmRSS") - baseline,
+    "result_mb": preprocessor.processed_df.memory_usage(deep=True).sum()
+    / 2 ** 20,
+}}))
+"""
+
+
+def measure(rows: int, low_memory: bool) -> dict:
+    """Preprocess a synthetic history in a new interpreter."""
+    result = subprocess.run(
+        [sys.executable, "-c",
+         PREPROCESS.format(rows=rows, low_memory=low_memory)],
+        cwd=ROOT, capture_output=True, text=True)
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr)
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--rows", type=int, default=100_000,
+        help="Number of transactions of the synthetic history")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists("/proc/self/clear_refs"):
+        print("The memory benchmark needs Linux /proc")
+        return 1
+
+    scale = 100_000 / args.rows
+    print(f"rows: {args.rows}, MB per 100k transactions")
+    print(f"{'mode':<12}{'peak':>10}{'retained':>10}{'result':>10}")
+    for low_memory in (False, True):
+        usage = measure(args.rows, low_memory)
+        mode = "low_memory" if low_memory else "default"
+        print(f"{mode:<12}{usage['peak_mb'] * scale:10.1f}"
+              f"{usage['retained_mb'] * scale:10.1f}"
+              f"{usage['result_mb'] * scale:10.1f}")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
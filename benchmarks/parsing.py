@@ -0,0 +1,227 @@
+"""
+Column parsing benchmark of the preprocessors.
+
+Parses the amount, percentage, installment and date columns of a synthetic
+statement history with the vectorized kernels of
+openfinance.parser.processors.parsing and with the per-row
+``Series.apply`` functions the preprocessors used before, checks that
+both give the same values and prints the time of each.
+
+Usage:
+    python benchmarks/parsing.py
+    python benchmarks/parsing.py --rows 1000000 --repeat 3
+"""
+import argparse
+import os
+import sys
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import openfinance.constants as ct  # noqa: E402
+from openfinance.parser.processors.parsing import (  # noqa: E402
+    first_token, parse_dates, parse_installments, parse_money,
+    parse_percent, second_token)
+
+
+def make_columns(rows: int, seed: int = 0) -> dict:
+    """Build amount and percentage columns as the statements print them."""
+    rng = np.random.default_rng(seed)
+    amounts = rng.integers(1, 500_000_000, rows) / 100
+    money = pd.Series(
+        [f"${value:,.2f}".replace(",", "_").replace(".", ",")
+         .replace("_", ".") for value in amounts], dtype=object)
+    commission = money + np.where(
+        rng.random(rows) < 0.3, " +$1.234,00", "")
+    money[rng.random(rows) < 0.05] = np.nan
+    # Amounts with a space after the currency sign, "$ 1.234,56"
+    spaced_money = money.str.replace("$", "$ ", regex=False)
+    percent = pd.Series(
+        [f"{value:.2f}%".replace(".", ",")
+         for value in rng.random(rows) * 40], dtype=object)
+    total = rng.integers(1, 37, rows)
+    current = rng.integers(1, 37, rows) % total + 1
+    installments = pd.Series(
+        [f"{c} de {t}" for c, t in zip(current, total)], dtype=object)
+    # About thirty movement days per monthly statement
+    days = pd.Timestamp("2023-01-01") + pd.to_timedelta(
+        np.sort(rng.integers(0, 3 * 365, rows)), unit="D")
+    spanish = {number: name for number, name in enumerate(ct.month_map, 1)}
+    nu_dates = pd.Series(
+        [f"{day.day:02d} {spanish[day.month]} {day.year}" for day in days],
+        dtype=object)
+    itau_dates = pd.Series(days.strftime("%d/%m/%y"), dtype=object)
+    return {"money": money, "spaced_money": spaced_money,
+            "commission": commission, "percent": percent,
+            "installments": installments, "nu_dates": nu_dates,
+            "itau_dates": itau_dates}
+
+
+def apply_parse_money(val: str) -> float:
+    """Per-row amount parser, as previously called through apply."""
+    if pd.isnull(val):
+        return np.nan
+    val = (
+        str(val)
+        .replace('.', '')
+        .replace('$', '')
+        .replace(' ', '')
+        .replace(',', '.')
+    )
+    try:
+        return float(val)
+    except Exception:
+        return np.nan
+
+
+def apply_parse_percent(val: str) -> float:
+    """Per-row percentage parser, as previously called through apply."""
+    if pd.isnull(val):
+        return np.nan
+    val = str(val).replace('%', '').replace(',', '.')
+    try:
+        return float(val) / 100
+    except Exception:
+        return np.nan
+
+
+def apply_extract_comision(val):
+    parts = str(val).split(" ")
+    if len(parts) > 1:
+        return parts[1]
+    else:
+        return np.nan
+
+
+def replace_months(dates: pd.Series) -> pd.Series:
+    for esp, eng in ct.month_map.items():
+        dates = dates.str.replace(esp, eng, regex=False)
+    return pd.to_datetime(dates, format='%d %b %Y', errors='coerce')
+
+
+def apply_parse_cuotas(cuota: str) -> tuple[int, int]:
+    if pd.isnull(cuota):
+        return (np.nan, np.nan)
+    m = re.search(r'(\d+)\s*de\s*(\d+)', str(cuota))
+    if m:
+        return int(m.group(1)), int(m.group(2))
+    else:
+        return (np.nan, np.nan)
+
+
+# Each case parses one column of the history: (column, apply, vectorized)
+CASES = {
+    "money": (
+        "money",
+        lambda x: x.astype(str).apply(apply_parse_money),
+        parse_money),
+    "first_token": (
+        "commission",
+        lambda x: x.astype(str).apply(lambda z: z.split(" ")[0])
+        .apply(apply_parse_money),
+        lambda x: parse_money(first_token(x))),
+    "spaced_token": (
+        "spaced_money",
+        lambda x: x.astype(str).apply(
+            lambda z: str(z).replace("$ ", "$").split(" ")[0])
+        .apply(apply_parse_money),
+        lambda x: parse_money(first_token(x))),
+    "second_token": (
+        "commission",
+        lambda x: x.astype(str).apply(apply_extract_comision)
+        .apply(apply_parse_money),
+        lambda x: parse_money(second_token(x))),
+    "percent": (
+        "percent",
+        lambda x: x.apply(apply_parse_percent),
+        parse_percent),
+    "installments": (
+        "installments",
+        lambda x: x.apply(lambda z: pd.Series(apply_parse_cuotas(z))),
+        parse_installments),
+    "nu_dates": (
+        "nu_dates",
+        replace_months,
+        lambda x: parse_dates(x, "%d %b %Y")),
+    "itau_dates": (
+        "itau_dates",
+        lambda x: pd.to_datetime(x, format="%d/%m/%y", errors="coerce"),
+        lambda x: parse_dates(x, "%d/%m/%y")),
+}
+
+
+# Amounts as the statements print them and their value, read from
+# their first token
+FIRST_TOKEN_CHECKS = {
+    "$1.234,56 USD": 1234.56,
+    "$ 1.234.567,89": 1234567.89,
+    " $ 1.234,56 +$12,00": 1234.56,
+    "- $ 12.000": -12000.0,
+    "-$12.000": -12000.0,
+}
+
+
+def check_first_token() -> None:
+    """Check that currency signs followed by spaces are parsed."""
+    values = pd.Series(list(FIRST_TOKEN_CHECKS), dtype=object)
+    parsed = parse_money(first_token(values)).tolist()
+    for (text, expected), value in zip(FIRST_TOKEN_CHECKS.items(), parsed):
+        assert value == expected, f"{text!r} parsed as {value}"
+
+
+def best_time(function, values: pd.Series, repeat: int) -> tuple:
+    """Return the best time of repeated runs and the last result."""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = function(values)
+        timings.append(time.perf_counter() - start)
+    return min(timings), result
+
+
+def assert_same(result, expected) -> None:
+    if pd.api.types.is_datetime64_any_dtype(expected):
+        pd.testing.assert_series_equal(
+            result, expected.astype(result.dtype), check_names=False)
+    elif isinstance(expected, pd.DataFrame):
+        np.testing.assert_array_equal(
+            result.to_numpy("float64", na_value=np.nan),
+            expected.to_numpy("float64"))
+    else:
+        pd.testing.assert_series_equal(
+            result, expected.astype("float64"), check_names=False)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--rows", type=int, default=100_000,
+        help="Number of rows of the synthetic history")
+    parser.add_argument(
+        "--repeat", type=int, default=5,
+        help="Runs of each implementation, the best one is reported")
+    args = parser.parse_args(argv)
+
+    check_first_token()
+    columns = make_columns(args.rows)
+    print(f"rows: {args.rows}")
+    print(f"{'column':<14}{'apply':>12}{'vectorized':>14}{'speedup':>10}")
+    for name, (column, apply_path, vectorized) in CASES.items():
+        apply_seconds, expected = best_time(
+            apply_path, columns[column], args.repeat)
+        vector_seconds, result = best_time(
+            vectorized, columns[column], args.repeat)
+        assert_same(result, expected)
+        print(f"{name:<14}{apply_seconds * 1000:9.1f} ms"
+              f"{vector_seconds * 1000:11.1f} ms"
+              f"{apply_seconds / vector_seconds:9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
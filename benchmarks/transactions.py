@@ -0,0 +1,112 @@
+"""
+Transaction materialization benchmark.
+
+Converts a synthetic processed Nu history to Transaction models with a
+Python loop that validates one model per row and with the column-wise
+conversion of openfinance.models.bulk, checks that both give the same
+models and prints the time of each. It also times the column validation
+alone and a TransactionBatch.
+
+Building the models takes about as long with either conversion, because
+creating the objects dominates. The validated frame and the batch are
+the fast paths for large histories.
+
+Usage:
+    python benchmarks/transactions.py
+    python benchmarks/transactions.py --rows 1000000 --repeat 3
+"""
+import argparse
+import os
+import sys
+from decimal import Decimal
+
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from benchmarks.parsing import best_time  # noqa: E402
+from openfinance.models.bulk import (  # noqa: E402
+    INSTITUTIONS, build_transactions, validate_transactions)
+from openfinance.models.transaction import Transaction  # noqa: E402
+from openfinance.models.transaction_batch import (  # noqa: E402
+    TransactionBatch)
+
+ACCOUNT_ID = "****1234"
+# Fields set by the conversion rather than read from the frame
+GENERATED_FIELDS = {"id", "posted_at"}
+
+
+def make_processed(rows: int, seed: int = 0) -> pd.DataFrame:
+    """Build processed movements as the preprocessors return them."""
+    rng = np.random.default_rng(seed)
+    merchants = np.array([f"COMERCIO {i}" for i in range(500)], dtype=object)
+    amounts = rng.integers(-5_000_000, 50_000_000, rows) / 100
+    return pd.DataFrame({
+        "txn_date": pd.Timestamp("2023-01-01") + pd.to_timedelta(
+            np.sort(rng.integers(0, 3 * 365, rows)), unit="D"),
+        "description": merchants[rng.integers(0, len(merchants), rows)],
+        "amount": amounts,
+        "bank_name": "nu_bank",
+    })
+
+
+def loop_transactions(df: pd.DataFrame) -> list[Transaction]:
+    """Validate one Transaction per row."""
+    return [
+        Transaction(
+            institution=INSTITUTIONS[row.bank_name],
+            account_id=ACCOUNT_ID,
+            txn_date=row.txn_date.date(),
+            amount=Decimal(f"{-row.amount:.2f}"),
+            txn_type="credit" if row.amount < 0 else "debit",
+            description=row.description)
+        for row in df.itertuples(index=False)]
+
+
+def bulk_transactions(df: pd.DataFrame) -> list[Transaction]:
+    return build_transactions(validate_transactions(df, ACCOUNT_ID))
+
+
+def assert_same(result: list, expected: list) -> None:
+    assert len(result) == len(expected)
+    for model, other in zip(result, expected):
+        assert (model.model_dump(exclude=GENERATED_FIELDS)
+                == other.model_dump(exclude=GENERATED_FIELDS))
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument(
+        "--rows", type=int, default=100_000,
+        help="Number of movements of the synthetic history")
+    parser.add_argument(
+        "--repeat", type=int, default=3,
+        help="Runs of each implementation, the best one is reported")
+    args = parser.parse_args(argv)
+
+    df = make_processed(args.rows)
+    loop_seconds, expected = best_time(loop_transactions, df, args.repeat)
+    bulk_seconds, result = best_time(bulk_transactions, df, args.repeat)
+    assert_same(result, expected)
+    validate_seconds, _ = best_time(
+        lambda values: validate_transactions(values, ACCOUNT_ID),
+        df, args.repeat)
+    batch_seconds, _ = best_time(
+        lambda values: TransactionBatch.from_processed(values, ACCOUNT_ID),
+        df, args.repeat)
+
+    print(f"rows: {args.rows}")
+    print(f"{'conversion':<22}{'time':>12}{'speedup':>10}")
+    print(f"{'per-row loop':<22}{loop_seconds * 1000:9.1f} ms")
+    for name, seconds in (("bulk models", bulk_seconds),
+                          ("validated frame", validate_seconds),
+                          ("transaction batch", batch_seconds)):
+        print(f"{name:<22}{seconds * 1000:9.1f} ms"
+              f"{loop_seconds / seconds:9.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,250 @@
+"""
+Batch ingestion of bank statements.
+
+Usage:
+    python -m openfinance.batch ./data --workers 4 --textract-concurrency 8
+    python -m openfinance.batch "./data/Nu_*.pdf" --summary summary.csv
+    python -m openfinance.batch ./data --backend text_layer
+    python -m openfinance.batch ./data --prefilter-pages
+    python -m openfinance.batch ./data --no-cache --no-index
+    python -m openfinance.batch ./data --output-format dataset
+"""
+import argparse
+import csv
+import glob
+import logging
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+import openfinance.constants as ct
+from openfinance.pipeline import process_statement
+
+logger = logging.getLogger(__name__)
+
+SUMMARY_FIELDS = [
+    "input_path",
+    "bank",
+    "period",
+    "backend",
+    "status",
+    "deduplicated",
+    "error",
+    "rows",
+    "output_path",
+    "parse_seconds",
+    "preprocess_seconds",
+    "seconds",
+]
+
+# Semaphore shared by every worker process, set by _init_worker
+_textract_slots = None
+
+
+def find_statements(inputs: list[str]) -> list[str]:
+    """
+    Expand directories and glob patterns into a sorted list of PDF files.
+    """
+    paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            paths.update(glob.glob(os.path.join(item, "**", "*.pdf"),
+                                   recursive=True))
+            paths.update(glob.glob(os.path.join(item, "**", "*.PDF"),
+                                   recursive=True))
+        else:
+            paths.update(glob.glob(item, recursive=True))
+    return sorted(paths)
+
+
+def _init_worker(textract_slots) -> None:
+    global _textract_slots
+    _textract_slots = textract_slots
+
+
+def _process_statement(
+        input_path: str,
+        output_folder: str,
+        max_workers: int,
+        use_cache: bool,
+        use_index: bool,
+        backend: str,
+        force: bool,
+        low_memory: bool,
+        output_format: str,
+        prefilter_pages: bool) -> dict:
+    return process_statement(
+        input_path=input_path,
+        output_folder=output_folder,
+        max_workers=max_workers,
+        textract_slots=_textract_slots,
+        use_cache=use_cache,
+        backend=backend,
+        use_index=use_index,
+        force=force,
+        low_memory=low_memory,
+        output_format=output_format,
+        prefilter_pages=prefilter_pages)
+
+
+def run_batch(
+        input_paths: list[str],
+        output_folder: str = ct.OUTPUT_FOLDER,
+        workers: int = None,
+        textract_concurrency: int = ct.MAX_TEXTRACT_WORKERS,
+        use_cache: bool = True,
+        use_index: bool = True,
+        backend: str = "textract",
+        force: bool = False,
+        low_memory: bool = False,
+        output_format: str = "csv",
+        prefilter_pages: bool = False) -> list[dict]:
+    """
+    Process many statements across a pool of processes, with the
+    Textract calls of all of them bounded by textract_concurrency.
+    Unlike process_statement alone, the pages of each statement are
+    analyzed concurrently and the Textract cache and the index of
+    processed statements are used unless turned off.
+
+    Returns:
+        list: One summary per statement, in the order of input_paths
+    """
+    workers = workers or os.cpu_count() or 1
+    os.makedirs(output_folder, exist_ok=True)
+
+    with multiprocessing.Manager() as manager:
+        textract_slots = manager.BoundedSemaphore(textract_concurrency)
+        with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_worker,
+                initargs=(textract_slots,)) as executor:
+            futures = {
+                executor.submit(
+                    _process_statement,
+                    input_path,
+                    output_folder,
+                    textract_concurrency,
+                    use_cache,
+                    use_index,
+                    backend,
+                    force,
+                    low_memory,
+                    output_format,
+                    prefilter_pages): input_path
+                for input_path in input_paths}
+
+            summaries = {}
+            for future in as_completed(futures):
+                input_path = futures[future]
+                try:
+                    summary = future.result()
+                except Exception as e:
+                    summary = {
+                        "input_path": input_path,
+                        "status": "error",
+                        "error": str(e)}
+                summaries[input_path] = summary
+                logger.info(
+                    f"[{len(summaries)}/{len(input_paths)}] "
+                    f"{summary['status']}: {input_path}")
+
+    return [summaries[input_path] for input_path in input_paths]
+
+
+def write_summary(summaries: list[dict], summary_path: str) -> None:
+    """Write the per-statement summaries to a CSV file."""
+    with open(summary_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(
+            f, fieldnames=SUMMARY_FIELDS, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(summaries)
+
+
+def main(argv: list[str] = None) -> int:
+    parser = argparse.ArgumentParser(
+        description="Process a directory or glob of bank statements.")
+    parser.add_argument(
+        "inputs", nargs="+",
+        help="Directories or glob patterns of PDF statements")
+    parser.add_argument(
+        "--output-folder", default=ct.OUTPUT_FOLDER,
+        help="Folder where the processed CSV files are saved")
+    parser.add_argument(
+        "--workers", type=int, default=None,
+        help="Number of worker processes (default: CPU count)")
+    parser.add_argument(
+        "--textract-concurrency", type=int,
+        default=ct.MAX_TEXTRACT_WORKERS,
+        help="Maximum concurrent Textract calls across all workers")
+    parser.add_argument(
+        "--summary", default=None,
+        help="Path of the summary CSV "
+             "(default: <output-folder>/batch_summary.csv)")
+    parser.add_argument(
+        "--no-cache", action="store_true",
+        help="Do not use the on-disk cache of Textract responses")
+    parser.add_argument(
+        "--no-index", action="store_true",
+        help="Do not skip the statements already processed, nor record "
+             "them in the index of processed statements")
+    parser.add_argument(
+        "--backend", choices=["textract", "text_layer"], default="textract",
+        help="Table extraction backend. text_layer reads the PDF text "
+             "and only sends scanned pages to Textract")
+    parser.add_argument(
+        "--force", action="store_true",
+        help="Process statements again even if they were already processed")
+    parser.add_argument(
+        "--low-memory", action="store_true",
+        help="Preprocess in place and keep only the compacted tables, "
+             "for large statements or many workers")
+    parser.add_argument(
+        "--output-format", choices=["csv", "dataset"], default="csv",
+        help="csv writes one CSV per statement; dataset writes them to "
+             "a Parquet dataset partitioned by bank, product and month "
+             "in <output-folder>/dataset (needs pyarrow)")
+    parser.add_argument(
+        "--prefilter-pages", action="store_true",
+        help="Skip the pages whose text layer shows no movements table "
+             "before sending them to Textract")
+    args = parser.parse_args(argv)
+
+    input_paths = find_statements(args.inputs)
+    if not input_paths:
+        logger.error(f"No PDF statements found in {args.inputs}")
+        return 1
+
+    logger.info(f"Processing {len(input_paths)} statements ...")
+    start = time.perf_counter()
+    summaries = run_batch(
+        input_paths=input_paths,
+        output_folder=args.output_folder,
+        workers=args.workers,
+        textract_concurrency=args.textract_concurrency,
+        use_cache=not args.no_cache,
+        use_index=not args.no_index,
+        backend=args.backend,
+        force=args.force,
+        low_memory=args.low_memory,
+        output_format=args.output_format,
+        prefilter_pages=args.prefilter_pages)
+
+    summary_path = args.summary or os.path.join(
+        args.output_folder, "batch_summary.csv")
+    write_summary(summaries, summary_path)
+
+    failed = sum(summary["status"] != "ok" for summary in summaries)
+    logger.info(
+        f"Processed {len(summaries)} statements in "
+        f"{time.perf_counter() - start:.1f}s, {failed} failed. "
+        f"Summary saved to {summary_path}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+        datefmt='%Y-%m-%d %H:%M:%S'
+    )
+    raise SystemExit(main())
@@ -0,0 +1,90 @@
+import os
+import threading
+import openfinance.constants as ct
+
+# Clients are created on first use and cached per process. boto3 clients
+# and their connection pools must not be shared with forked children.
+_clients = {}
+_session = None
+_lock = threading.Lock()
+
+
+def _reset_after_fork() -> None:
+    global _session, _lock
+    _clients.clear()
+    _session = None
+    _lock = threading.Lock()
+
+
+os.register_at_fork(after_in_child=_reset_after_fork)
+
+# Services whose calls go through a ThroughputGovernor, which owns their
+# retries and backoff. botocore retrying inside a governed call would
+# send several requests for a single token, unseen by its stats.
+GOVERNED_SERVICES = ("textract", "s3")
+
+
+def get_client_config(service_name: str = None):
+    """
+    Return the botocore configuration of the clients of a service.
+
+    Args:
+        service_name (str, optional): AWS service name. The clients of
+            GOVERNED_SERVICES make a single attempt per call.
+    """
+    from botocore.config import Config
+    max_attempts = (1 if service_name in GOVERNED_SERVICES
+                    else ct.AWS_MAX_ATTEMPTS)
+    return Config(
+        max_pool_connections=ct.AWS_MAX_POOL_CONNECTIONS,
+        connect_timeout=ct.AWS_CONNECT_TIMEOUT,
+        read_timeout=ct.AWS_READ_TIMEOUT,
+        retries={
+            "mode": ct.AWS_RETRY_MODE,
+            "max_attempts": max_attempts
+        }
+    )
+
+
+def get_transfer_config():
+    """Return the S3 transfer configuration of multipart uploads."""
+    from boto3.s3.transfer import TransferConfig
+    return TransferConfig(
+        multipart_threshold=ct.S3_MULTIPART_THRESHOLD,
+        multipart_chunksize=ct.S3_MULTIPART_CHUNKSIZE,
+        max_concurrency=ct.S3_MAX_CONCURRENCY
+    )
+
+
+def get_client(service_name: str):
+    """
+    Return the process-local boto3 client of a service,
+    creating it on first use.
+
+    Args:
+        service_name (str): AWS service name, e.g. "textract" or "s3"
+    """
+    global _session
+    client = _clients.get(service_name)
+    if client is not None:
+        return client
+
+    with _lock:
+        if service_name not in _clients:
+            if _session is None:
+                # boto3 takes a few hundred milliseconds to import
+                import boto3
+                _session = boto3.session.Session(**ct.aws_credentials)
+            _clients[service_name] = _session.client(
+                service_name, config=get_client_config(service_name))
+        return _clients[service_name]
+
+
+def get_textract_client():
+    """Return the process-local Textract client."""
+    return get_client("textract")
+
+
+def get_s3_client():
+    """Return the process-local S3 client."""
+    return get_client("s3")
@@ -1,38 +1,76 @@
-import boto3
-from dotenv import dotenv_values
-
-config = dotenv_values(".env")
-
-AWS_ACCESS_KEY = config.get("AWS_ACCESS_KEY")
-AWS_PRIVATE_ACCESS_KEY = config.get("AWS_PRIVATE_ACCESS_KEY")
 REGION_NAME = "us-east-1"
 TEXTRACT_BUCKET_NAME = "openfinance-colombia-textract-bucket"
+# Chunks are stored by content hash under this prefix and shared by
+# every job; expire them with a lifecycle rule on the bucket
+TEXTRACT_CHUNKS_PREFIX = "chunks/"
 TEMP_FOLDER = "tmp"
 MAX_PDF_CHUNK_SIZE = 1
+MAX_TEXTRACT_WORKERS = 8
+# Client-side throughput limits, sized to the account quotas
+TEXTRACT_MAX_TPS = 10
+S3_MAX_TPS = 100
+AWS_MAX_RETRIES = 5
+# Files larger than the threshold are uploaded in parts, in parallel
+S3_MULTIPART_THRESHOLD = 8 * 1024 * 1024
+S3_MULTIPART_CHUNKSIZE = 8 * 1024 * 1024
+S3_MAX_CONCURRENCY = 4
 OUTPUT_FOLDER = "output"
-NU_BANK_PASSWORD = config.get("NU_BANK_PASSWORD")
-ITAU_PASSWORD = config.get("ITAU_PASSWORD")
+DATASET_FOLDER = "output/dataset"
+TEXTRACT_CACHE_FOLDER = ".cache/textract"
+TEXTRACT_CACHE_MAX_BYTES = 512 * 1024 * 1024
+STATEMENT_INDEX_PATH = ".cache/statements.sqlite3"
+LEDGER_PATH = "output/ledger.sqlite3"
 
-# Define AWS credentials as a dictionary
-aws_credentials = {
-    "aws_access_key_id": AWS_ACCESS_KEY,
-    "aws_secret_access_key": AWS_PRIVATE_ACCESS_KEY,
-    "region_name": REGION_NAME
-}
+_config = None
 
-# Initialize AWS Textract client
-textract_client = boto3.client(
-    'textract',
-    **aws_credentials
-)
-
-s3_client = boto3.client(
-    's3',
-    **aws_credentials
-)
+# Settings read from .env the first time they are used, with their
+# defaults and types. boto3 client settings can be overridden too.
+_CONFIG_SETTINGS = {
+    "AWS_ACCESS_KEY": (None, str),
+    "AWS_PRIVATE_ACCESS_KEY": (None, str),
+    "NU_BANK_PASSWORD": (None, str),
+    "ITAU_PASSWORD": (None, str),
+    "AWS_MAX_POOL_CONNECTIONS": (50, int),
+    "AWS_CONNECT_TIMEOUT": (5, float),
+    "AWS_READ_TIMEOUT": (60, float),
+    "AWS_RETRY_MODE": ("standard", str),
+    "AWS_MAX_ATTEMPTS": (3, int),
+}
 
 month_map = {
     'ENE': 'JAN', 'FEB': 'FEB', 'MAR': 'MAR', 'ABR': 'APR', 'MAY': 'MAY',
     'JUN': 'JUN', 'JUL': 'JUL', 'AGO': 'AUG', 'SEP': 'SEP',
     'OCT': 'OCT', 'NOV': 'NOV', 'DIC': 'DEC'
 }
+
+
+def get_config() -> dict:
+    """Read the .env file once and return its values."""
+    global _config
+    if _config is None:
+        from dotenv import dotenv_values
+        _config = dotenv_values(".env")
+    return _config
+
+
+def __getattr__(name: str):
+    # .env values and AWS clients are loaded lazily to keep imports cheap
+    if name == "config":
+        return get_config()
+    if name in _CONFIG_SETTINGS:
+        default, cast = _CONFIG_SETTINGS[name]
+        value = get_config().get(name)
+        return cast(value) if value is not None else default
+    if name == "aws_credentials":
+        return {
+            "aws_access_key_id": __getattr__("AWS_ACCESS_KEY"),
+            "aws_secret_access_key": __getattr__("AWS_PRIVATE_ACCESS_KEY"),
+            "region_name": REGION_NAME
+        }
+    if name == "textract_client":
+        from openfinance.clients import get_textract_client
+        return get_textract_client()
+    if name == "s3_client":
+        from openfinance.clients import get_s3_client
+        return get_s3_client()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
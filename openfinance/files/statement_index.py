@@ -0,0 +1,131 @@
+import hashlib
+import json
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+import openfinance.constants as ct
+
+
+logger = logging.getLogger(__name__)
+
+
+class StatementIndex:
+    """
+    Local index of the statements already processed, keyed by a
+    fingerprint of the file content, the bank and the statement period,
+    so a statement that arrives twice is only processed once.
+
+    The index is a SQLite database, safe to share between the worker
+    processes of a batch run.
+    """
+
+    def __init__(self, index_path: str = ct.STATEMENT_INDEX_PATH):
+        """
+        Initialize the StatementIndex and create its table.
+
+        Args:
+            index_path (str): Path to the SQLite database
+        """
+        self.index_path = index_path
+        folder = os.path.dirname(index_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as connection:
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS statements (
+                    fingerprint TEXT PRIMARY KEY,
+                    file_hash TEXT NOT NULL,
+                    bank TEXT,
+                    period TEXT,
+                    input_path TEXT,
+                    result TEXT NOT NULL,
+                    processed_at REAL NOT NULL
+                )
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS statements_bank_period "
+                "ON statements (bank, period)"
+            )
+
+    @staticmethod
+    def make_fingerprint(file_hash: str, bank: str, period: str) -> str:
+        """Build the fingerprint of a statement."""
+        return hashlib.sha256(
+            f"{file_hash}|{bank}|{period or ''}".encode("utf-8")
+        ).hexdigest()
+
+    def get(self, fingerprint: str) -> dict | None:
+        """
+        Return the result stored for a fingerprint, or None.
+        """
+        with self._connect() as connection:
+            row = connection.execute(
+                "SELECT result FROM statements WHERE fingerprint = ?",
+                (fingerprint,)
+            ).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def find_period(self, bank: str, period: str) -> list[str]:
+        """
+        Return the input paths already processed for a bank and period.
+        """
+        with self._connect() as connection:
+            rows = connection.execute(
+                "SELECT input_path FROM statements "
+                "WHERE bank = ? AND period = ?",
+                (bank, period)
+            ).fetchall()
+        return [row[0] for row in rows]
+
+    def put(
+            self,
+            fingerprint: str,
+            file_hash: str,
+            bank: str,
+            period: str,
+            result: dict) -> None:
+        """
+        Store the result of a statement, replacing any previous one.
+        """
+        with self._connect() as connection:
+            connection.execute(
+                """
+                INSERT INTO statements (
+                    fingerprint, file_hash, bank, period,
+                    input_path, result, processed_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (fingerprint) DO UPDATE SET
+                    input_path = excluded.input_path,
+                    result = excluded.result,
+                    processed_at = excluded.processed_at
+                """,
+                (fingerprint, file_hash, bank, period,
+                 result.get("input_path"), json.dumps(result, default=str),
+                 time.time())
+            )
+        logger.info(
+            f"Indexed statement {result.get('input_path')} "
+            f"({bank}, {period})")
+
+    def remove(self, fingerprint: str) -> None:
+        """Remove a statement from the index."""
+        with self._connect() as connection:
+            connection.execute(
+                "DELETE FROM statements WHERE fingerprint = ?",
+                (fingerprint,)
+            )
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call keeps the index usable
+        # from threads and forked worker processes
+        connection = sqlite3.connect(self.index_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
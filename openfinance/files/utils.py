@@ -1,3 +1,4 @@
+import hashlib
 import shutil
 import os
 
@@ -8,3 +9,14 @@ def reset_folder(folder_path: str):
     """
     shutil.rmtree(folder_path)
     os.makedirs(folder_path)
+
+
+def hash_file(file_path: str, algorithm: str = "sha256") -> str:
+    """
+    Return the hex digest of the content of a file.
+    """
+    digest = hashlib.new(algorithm)
+    with open(file_path, "rb") as f:
+        for block in iter(lambda: f.read(1024 * 1024), b""):
+            digest.update(block)
+    return digest.hexdigest()
@@ -0,0 +1,62 @@
+import logging
+import os
+import shutil
+import uuid
+import weakref
+import openfinance.constants as ct
+
+logger = logging.getLogger(__name__)
+
+
+def _remove_folder(path: str) -> None:
+    # Also called by the finalizer, which must not reference the
+    # workspace itself
+    if os.path.isdir(path):
+        shutil.rmtree(path, ignore_errors=True)
+        logger.info(f"Removed workspace {path}")
+
+
+class JobWorkspace:
+    """
+    Isolated temporary folder of a single parse job, so several
+    statements can be processed at the same time without overwriting
+    or deleting each other's files.
+
+    The folder is created the first time its path is used. It is
+    removed by cleanup(), on leaving the context or, for a workspace
+    that is never cleaned up, when it is garbage collected or the
+    interpreter exits. Files kept from a job must be copied out of the
+    folder before then.
+    """
+
+    def __init__(
+            self,
+            base_folder: str = ct.TEMP_FOLDER,
+            job_id: str = None):
+        """
+        Initialize the JobWorkspace. Its folder is not created yet.
+
+        Args:
+            base_folder (str): Folder under which the workspace is created
+            job_id (str, optional): Identifier of the job.
+                A random one is generated if not given.
+        """
+        self.job_id = job_id or uuid.uuid4().hex
+        self._path = os.path.join(base_folder, f"job_{self.job_id}")
+        self._finalizer = weakref.finalize(self, _remove_folder, self._path)
+
+    @property
+    def path(self) -> str:
+        """Path to the workspace folder, created on first use."""
+        os.makedirs(self._path, exist_ok=True)
+        return self._path
+
+    def cleanup(self) -> None:
+        """Remove the workspace folder and everything in it."""
+        _remove_folder(self._path)
+
+    def __enter__(self) -> "JobWorkspace":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.cleanup()
@@ -0,0 +1,237 @@
+from __future__ import annotations
+
+import logging
+import uuid
+from datetime import datetime, timezone
+from decimal import Decimal
+from itertools import repeat
+from typing import get_args
+
+import numpy as np
+import pandas as pd
+
+from openfinance.models.transaction import Transaction
+
+
+logger = logging.getLogger(__name__)
+
+# Institution tag of the bank names the preprocessors write
+INSTITUTIONS = {"itau": "itau", "nu_bank": "nubank", "nubank": "nubank"}
+# Columns of a validated frame, in the order of the Transaction fields
+VALIDATED_COLUMNS = [
+    "institution", "account_id", "txn_date", "amount", "currency",
+    "txn_type", "category", "description"]
+# Invalid values quoted in a validation error
+ERROR_EXAMPLES = 5
+
+
+def _check(errors: list, name: str, invalid: pd.Series, values: pd.Series):
+    """Record the invalid values of a column, if any."""
+    invalid = invalid.to_numpy(dtype=bool, na_value=True)
+    if invalid.any():
+        examples = values[invalid].unique()[:ERROR_EXAMPLES].tolist()
+        errors.append(f"{name}: {int(invalid.sum())} invalid values, "
+                      f"e.g. {examples}")
+
+
+def _is_text(values: pd.Series) -> bool:
+    """Whether the non-missing values of a column are all strings."""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return pd.api.types.is_string_dtype(values.cat.categories)
+    return pd.api.types.is_string_dtype(values.dropna())
+
+
+def validate_transactions(
+        df: pd.DataFrame,
+        account_id: str,
+        institution: str = None,
+        currency: str = "COP") -> pd.DataFrame:
+    """
+    Validate the movements of a preprocessed frame as Transaction
+    fields, a whole column at a time, and return them as a frame with
+    the VALIDATED_COLUMNS.
+
+    The processed amounts are positive for purchases and negative for
+    payments, so purchases become debits with a negative amount and
+    payments credits with a positive one. Amounts are rounded to cents.
+
+    Args:
+        df (pd.DataFrame): Processed movements, with txn_date, amount
+            and description columns, plus bank_name unless institution
+            is given and an optional category column
+        account_id (str): Bank-side account or card identifier
+        institution (str, optional): Institution of all the movements.
+            If None, it is read from the bank_name column.
+        currency (str): Three-letter currency of the amounts
+
+    Returns:
+        pd.DataFrame: Validated movements, with the index of df
+
+    Raises:
+        ValueError: If a column is missing or has invalid values
+    """
+    fields = Transaction.model_fields
+    institutions = get_args(fields["institution"].annotation)
+    txn_types = get_args(fields["txn_type"].annotation)
+
+    required = ["txn_date", "amount", "description"]
+    if institution is None:
+        required.append("bank_name")
+    missing = [name for name in required if name not in df.columns]
+    if missing:
+        raise ValueError(f"Missing transaction columns: {missing}")
+    if not isinstance(account_id, str) or not account_id:
+        raise ValueError(f"Invalid account id: {account_id!r}")
+    if not isinstance(currency, str) or len(currency) != 3:
+        raise ValueError(f"Invalid currency: {currency!r}")
+
+    errors = []
+    if institution is not None:
+        if institution not in institutions:
+            raise ValueError(
+                f"Invalid institution {institution!r}, "
+                f"expected one of {list(institutions)}")
+        tags = pd.Series(institution, index=df.index, dtype=object)
+    else:
+        banks = df["bank_name"].astype(object)
+        tags = banks.map(INSTITUTIONS)
+        _check(errors, "bank_name", ~tags.isin(institutions), banks)
+
+    dates = df["txn_date"]
+    if not pd.api.types.is_datetime64_dtype(dates):
+        dates = pd.to_datetime(dates, errors="coerce")
+    _check(errors, "txn_date", dates.isna(), df["txn_date"])
+
+    amounts = pd.to_numeric(df["amount"], errors="coerce").astype("float64")
+    _check(errors, "amount", ~np.isfinite(amounts), df["amount"])
+
+    descriptions = df["description"]
+    invalid = descriptions.isna()
+    if not _is_text(descriptions):
+        invalid = pd.Series(True, index=df.index)
+    _check(errors, "description", invalid, descriptions.astype(object))
+
+    if "category" in df.columns:
+        categories = df["category"]
+        invalid = pd.Series(False, index=df.index)
+        if not _is_text(categories):
+            invalid = categories.notna()
+        categories = categories.astype(object)
+        _check(errors, "category", invalid, categories)
+    else:
+        categories = pd.Series(None, index=df.index, dtype=object)
+
+    if errors:
+        raise ValueError("Invalid transactions: " + "; ".join(errors))
+
+    return pd.DataFrame({
+        "institution": tags.astype(object),
+        "account_id": account_id,
+        "txn_date": dates.dt.normalize(),
+        # Adding zero turns the -0.0 of zero amounts into 0.0
+        "amount": -amounts.round(2) + 0.0,
+        "currency": currency,
+        "txn_type": np.where(amounts < 0, txn_types[1], txn_types[0]),
+        "category": categories,
+        "description": descriptions.astype(object),
+    }, index=df.index)
+
+
+def transactions_from_frame(
+        df: pd.DataFrame,
+        account_id: str,
+        institution: str = None,
+        currency: str = "COP",
+        posted_at: datetime = None) -> list[Transaction]:
+    """
+    Build the Transaction models of a preprocessed frame. The columns
+    are validated at once by validate_transactions, so the models are
+    built without validating each of them again.
+
+    Creating the models is not the fast path: it costs about as much
+    as validating one model per row. Callers that handle many
+    movements should keep them as the frame of validate_transactions
+    or as a TransactionBatch, which builds models only when they are
+    indexed.
+
+    Args:
+        df (pd.DataFrame): Processed movements
+        account_id (str): Bank-side account or card identifier
+        institution (str, optional): Institution of all the movements.
+            If None, it is read from the bank_name column.
+        currency (str): Three-letter currency of the amounts
+        posted_at (datetime, optional): Ingestion timestamp of the
+            movements. Defaults to now, in UTC.
+
+    Returns:
+        list[Transaction]: One model per movement, in the order of df
+
+    Raises:
+        ValueError: If a column is missing or has invalid values
+    """
+    validated = validate_transactions(df, account_id, institution, currency)
+    return build_transactions(validated, posted_at)
+
+
+def build_transactions(
+        validated: pd.DataFrame,
+        posted_at: datetime = None) -> list[Transaction]:
+    """
+    Build Transaction models from a frame returned by
+    validate_transactions, without validating them again. The ids and
+    ingestion timestamps are read from the id and posted_at columns
+    when the frame has them, and generated otherwise.
+
+    Skipping the validation saves little: most of the time goes into
+    creating one Python object per field and per row. See
+    transactions_from_frame for the faster alternatives.
+
+    Args:
+        validated (pd.DataFrame): Validated movements
+        posted_at (datetime, optional): Ingestion timestamp of the
+            movements without a posted_at column. Defaults to now, in
+            UTC.
+
+    Returns:
+        list[Transaction]: One model per movement, in the order of
+            validated
+    """
+    if posted_at is None:
+        posted_at = datetime.now(timezone.utc)
+    ids = (validated["id"].tolist() if "id" in validated.columns
+           else iter(uuid.uuid4, None))
+    timestamps = (
+        validated["posted_at"].dt.to_pydatetime().tolist()
+        if "posted_at" in validated.columns else repeat(posted_at))
+    # Each column is converted to Python values in a single pass
+    rows = zip(
+        ids,
+        timestamps,
+        validated["institution"].tolist(),
+        validated["account_id"].tolist(),
+        validated["txn_date"].dt.date.tolist(),
+        map(Decimal, np.char.mod(
+            "%.2f", validated["amount"].to_numpy(dtype="float64")).tolist()),
+        validated["currency"].tolist(),
+        validated["txn_type"].tolist(),
+        validated["category"].to_numpy(dtype=object, na_value=None).tolist(),
+        validated["description"].tolist())
+
+    transactions = [
+        Transaction.model_construct(
+            id=txn_id,
+            institution=institution,
+            account_id=account_id,
+            txn_date=txn_date,
+            posted_at=timestamp,
+            amount=amount,
+            currency=currency,
+            txn_type=txn_type,
+            category=category,
+            description=description,
+            metadata={})
+        for (txn_id, timestamp, institution, account_id, txn_date,
+             amount, currency, txn_type, category, description) in rows]
+    logger.debug(f"Built {len(transactions)} transactions")
+    return transactions
+
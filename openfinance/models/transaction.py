@@ -26,8 +26,9 @@ class Transaction(BaseModel):
     txn_date: date = Field(
         ...,
         description="Bank-posted date (local to institution)")
-    posted_at: datetime = Field(default_factory=datetime.now(timezone.utc),
-                                description="Ingestion timestamp (UTC)")
+    posted_at: datetime = Field(
+        default_factory=lambda: datetime.now(timezone.utc),
+        description="Ingestion timestamp (UTC)")
 
     # money & classification
     amount: Decimal = Field(
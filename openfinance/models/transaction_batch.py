@@ -0,0 +1,408 @@
+from __future__ import annotations
+
+import logging
+import os
+import uuid
+from datetime import date, datetime, timezone
+from typing import Iterable, Sequence
+
+import numpy as np
+import pandas as pd
+
+from openfinance.models.bulk import build_transactions, validate_transactions
+from openfinance.models.transaction import Transaction
+
+
+logger = logging.getLogger(__name__)
+
+# Minor units per unit of currency, e.g. cents per peso
+MINOR_UNITS = 100
+# Dictionary-encoded columns and the integer type of their codes.
+# Missing categories have the code -1.
+DICTIONARY_COLUMNS = {
+    "institution": np.int8,
+    "account_id": np.int32,
+    "currency": np.int16,
+    "txn_type": np.int8,
+    "category": np.int32,
+    "description": np.int32,
+}
+
+
+def _random_ids(rows: int) -> np.ndarray:
+    """Return version 4 UUIDs as the rows of a (rows, 16) byte array."""
+    ids = np.frombuffer(os.urandom(16 * rows), dtype=np.uint8)
+    ids = ids.reshape(rows, 16).copy()
+    ids[:, 6] = ids[:, 6] & 0x0F | 0x40
+    ids[:, 8] = ids[:, 8] & 0x3F | 0x80
+    return ids
+
+
+def _encode(values: Sequence, dtype) -> tuple[np.ndarray, tuple]:
+    """Dictionary-encode values into codes and the distinct values."""
+    codes, distinct = pd.factorize(pd.Series(values, dtype=object))
+    if len(distinct) > np.iinfo(dtype).max + 1:
+        raise ValueError(
+            f"Too many distinct values ({len(distinct)}) for {dtype}")
+    return codes.astype(dtype), tuple(distinct.tolist())
+
+
+def _to_cents(amounts: np.ndarray) -> np.ndarray:
+    return np.rint(amounts * MINOR_UNITS).astype(np.int64)
+
+
+class TransactionBatch:
+    """
+    Transactions held as columns of numpy arrays rather than as
+    Transaction models, at about 50 bytes per transaction:
+
+    - ids: UUID bytes, a (rows, 16) uint8 array
+    - amounts: int64 minor units (cents), debits negative
+    - dates: int32 days since 1970-01-01
+    - posted_at: int64 microseconds since the epoch, in UTC
+    - codes: int codes of the DICTIONARY_COLUMNS into dictionaries,
+      the tuple of distinct values of each column
+
+    Slicing a batch returns a view over the same arrays and
+    dictionaries, without copying. Filtering copies only the selected
+    rows of the arrays, unless they are consecutive; the dictionaries
+    are always shared. Metadata is not
+    kept, so batches are built from models without metadata.
+    """
+
+    def __init__(
+            self,
+            ids: np.ndarray,
+            amounts: np.ndarray,
+            dates: np.ndarray,
+            posted_at: np.ndarray,
+            codes: dict[str, np.ndarray],
+            dictionaries: dict[str, tuple]):
+        """
+        Initialize the TransactionBatch.
+
+        Args:
+            ids (np.ndarray): UUID bytes, (rows, 16) uint8
+            amounts (np.ndarray): Amounts in minor units, int64
+            dates (np.ndarray): Days since 1970-01-01, int32
+            posted_at (np.ndarray): Microseconds since the epoch, int64
+            codes (dict): Codes of each of the DICTIONARY_COLUMNS
+            dictionaries (dict): Distinct values of each of the
+                DICTIONARY_COLUMNS
+
+        Raises:
+            ValueError: If the columns do not have the same length or
+                a dictionary column is missing
+        """
+        missing = [name for name in DICTIONARY_COLUMNS
+                   if name not in codes or name not in dictionaries]
+        if missing:
+            raise ValueError(f"Missing dictionary columns: {missing}")
+        rows = len(amounts)
+        lengths = [len(ids), len(dates), len(posted_at)] + [
+            len(codes[name]) for name in DICTIONARY_COLUMNS]
+        if any(length != rows for length in lengths):
+            raise ValueError("All the columns of a batch must have the "
+                             "same length")
+        self.ids = ids
+        self.amounts = amounts
+        self.dates = dates
+        self.posted_at = posted_at
+        self.codes = {name: codes[name] for name in DICTIONARY_COLUMNS}
+        self.dictionaries = {
+            name: tuple(dictionaries[name]) for name in DICTIONARY_COLUMNS}
+
+    def __len__(self) -> int:
+        return len(self.amounts)
+
+    def __getitem__(self, key):
+        """
+        Return the transaction at an integer position as a model, or
+        the transactions of a slice as a batch view.
+        """
+        if isinstance(key, slice):
+            return self._select(key)
+        if isinstance(key, (int, np.integer)):
+            position = range(len(self))[key]
+            return self[position:position + 1].to_models()[0]
+        raise TypeError(
+            f"Batches are indexed by int or slice, not {type(key).__name__}")
+
+    @property
+    def nbytes(self) -> int:
+        """Bytes held by the arrays of the batch."""
+        return (self.ids.nbytes + self.amounts.nbytes + self.dates.nbytes
+                + self.posted_at.nbytes
+                + sum(codes.nbytes for codes in self.codes.values()))
+
+    def _select(self, selection) -> TransactionBatch:
+        return TransactionBatch(
+            self.ids[selection],
+            self.amounts[selection],
+            self.dates[selection],
+            self.posted_at[selection],
+            {name: codes[selection] for name, codes in self.codes.items()},
+            self.dictionaries)
+
+    def filter(self, selection) -> TransactionBatch:
+        """
+        Return the transactions of a boolean mask or of an array of
+        positions, e.g. one built by mask. A selection of consecutive
+        transactions, such as a date range of a batch sorted by date,
+        is returned as a view without copying.
+
+        Args:
+            selection: Boolean mask with one value per transaction, or
+                positions of the transactions to keep
+
+        Returns:
+            TransactionBatch: Selected transactions
+        """
+        selection = np.asarray(selection)
+        if selection.dtype == bool and len(selection) != len(self):
+            raise ValueError(
+                f"Mask of {len(selection)} values for {len(self)} "
+                f"transactions")
+        positions = (np.flatnonzero(selection) if selection.dtype == bool
+                     else selection)
+        if (len(positions) and positions.ndim == 1
+                and positions[-1] - positions[0] + 1 == len(positions)
+                and (len(positions) == 1
+                     or bool(np.all(np.diff(positions) == 1)))):
+            return self[int(positions[0]):int(positions[-1]) + 1]
+        return self._select(positions)
+
+    def mask(
+            self,
+            institutions: Iterable[str] = None,
+            categories: Iterable[str] = None,
+            txn_type: str = None,
+            start: date | str = None,
+            end: date | str = None) -> np.ndarray:
+        """
+        Return the boolean mask of the transactions matching all the
+        given conditions. Values are compared as codes and days, without
+        decoding the batch.
+
+        Args:
+            institutions (Iterable[str], optional): Institutions to keep
+            categories (Iterable[str], optional): Categories to keep
+            txn_type (str, optional): "debit" or "credit"
+            start (date | str, optional): First transaction date
+            end (date | str, optional): Last transaction date
+
+        Returns:
+            np.ndarray: Boolean mask, one value per transaction
+        """
+        keep = np.ones(len(self), dtype=bool)
+        for name, values in (("institution", institutions),
+                             ("category", categories),
+                             ("txn_type", None if txn_type is None
+                              else [txn_type])):
+            if values is not None:
+                values = set(values)
+                wanted = [code for code, value
+                          in enumerate(self.dictionaries[name])
+                          if value in values]
+                keep &= np.isin(self.codes[name], wanted)
+        if start is not None:
+            keep &= self.dates >= _to_days(pd.to_datetime([start]))[0]
+        if end is not None:
+            keep &= self.dates <= _to_days(pd.to_datetime([end]))[0]
+        return keep
+
+    @classmethod
+    def from_processed(
+            cls,
+            df: pd.DataFrame,
+            account_id: str,
+            institution: str = None,
+            currency: str = "COP") -> TransactionBatch:
+        """
+        Validate the movements of a preprocessed frame and hold them in
+        a batch. See validate_transactions for the conversion.
+
+        Args:
+            df (pd.DataFrame): Processed movements
+            account_id (str): Bank-side account or card identifier
+            institution (str, optional): Institution of all the
+                movements. If None, it is read from the bank_name column.
+            currency (str): Three-letter currency of the amounts
+
+        Returns:
+            TransactionBatch: Validated transactions
+
+        Raises:
+            ValueError: If a column is missing or has invalid values
+        """
+        return cls.from_pandas(
+            validate_transactions(df, account_id, institution, currency))
+
+    @classmethod
+    def from_pandas(cls, df: pd.DataFrame) -> TransactionBatch:
+        """
+        Hold a frame of Transaction fields in a batch, e.g. one returned
+        by validate_transactions or by to_pandas. The id and posted_at
+        columns are optional: missing ids are generated and a missing
+        posted_at is now.
+
+        Args:
+            df (pd.DataFrame): Transactions, with signed amounts in
+                units of currency
+
+        Returns:
+            TransactionBatch: The transactions
+        """
+        rows = len(df)
+        if "id" in df.columns:
+            ids = np.frombuffer(
+                b"".join(uuid.UUID(str(value)).bytes for value in df["id"]),
+                dtype=np.uint8).reshape(rows, 16).copy()
+        else:
+            ids = _random_ids(rows)
+        if "posted_at" in df.columns:
+            posted_at = _to_microseconds(
+                pd.to_datetime(df["posted_at"], utc=True))
+        else:
+            posted_at = np.repeat(_to_microseconds(
+                pd.to_datetime([datetime.now(timezone.utc)])), rows)
+
+        codes, dictionaries = {}, {}
+        for name, dtype in DICTIONARY_COLUMNS.items():
+            codes[name], dictionaries[name] = _encode(df[name], dtype)
+        return cls(
+            ids=ids,
+            amounts=_to_cents(df["amount"].to_numpy(dtype="float64")),
+            dates=_to_days(pd.to_datetime(df["txn_date"])),
+            posted_at=posted_at,
+            codes=codes,
+            dictionaries=dictionaries)
+
+    def to_pandas(self, ids: bool = True) -> pd.DataFrame:
+        """
+        Return the transactions as a frame of Transaction fields, with
+        the dictionary columns as categoricals over the dictionaries
+        and the amounts as float64 units of currency.
+
+        Args:
+            ids (bool): Include the id column, as UUIDs
+
+        Returns:
+            pd.DataFrame: The transactions
+        """
+        columns = {}
+        if ids:
+            columns["id"] = pd.Series(
+                [uuid.UUID(bytes=value.tobytes()) for value in self.ids],
+                dtype=object)
+        for name in DICTIONARY_COLUMNS:
+            columns[name] = pd.Categorical.from_codes(
+                self.codes[name], categories=self.dictionaries[name])
+        columns["txn_date"] = self.dates.astype("datetime64[D]").astype(
+            "datetime64[ns]")
+        columns["posted_at"] = pd.to_datetime(
+            self.posted_at, unit="us", utc=True)
+        columns["amount"] = self.amounts / MINOR_UNITS
+        return pd.DataFrame(columns)
+
+    @classmethod
+    def from_models(cls, transactions: Sequence[Transaction]) \
+            -> TransactionBatch:
+        """
+        Hold Transaction models in a batch.
+
+        Args:
+            transactions (Sequence[Transaction]): Models without
+                metadata and with amounts in whole minor units
+
+        Returns:
+            TransactionBatch: The transactions
+
+        Raises:
+            ValueError: If a model has metadata or an amount with
+                fractions of a minor unit
+        """
+        amounts = []
+        for transaction in transactions:
+            minor_units = transaction.amount * MINOR_UNITS
+            if minor_units != minor_units.to_integral_value():
+                raise ValueError(
+                    f"Amount {transaction.amount} of {transaction.id} has "
+                    f"fractions of a minor unit")
+            if transaction.metadata:
+                raise ValueError(
+                    f"Metadata of {transaction.id} is not kept in a batch")
+            amounts.append(int(minor_units))
+
+        rows = len(transactions)
+        codes, dictionaries = {}, {}
+        for name, dtype in DICTIONARY_COLUMNS.items():
+            codes[name], dictionaries[name] = _encode(
+                [getattr(transaction, name) for transaction in transactions],
+                dtype)
+        return cls(
+            ids=np.frombuffer(
+                b"".join(transaction.id.bytes for transaction in transactions),
+                dtype=np.uint8).reshape(rows, 16).copy(),
+            amounts=np.array(amounts, dtype=np.int64),
+            dates=np.array(
+                [transaction.txn_date for transaction in transactions],
+                dtype="datetime64[D]").view(np.int64).astype(np.int32),
+            posted_at=_to_microseconds(pd.to_datetime(
+                [transaction.posted_at for transaction in transactions],
+                utc=True)),
+            codes=codes,
+            dictionaries=dictionaries)
+
+    def to_models(self) -> list[Transaction]:
+        """Return the transactions as Transaction models."""
+        return build_transactions(self.to_pandas())
+
+    @classmethod
+    def concat(cls, batches: Sequence[TransactionBatch]) -> TransactionBatch:
+        """
+        Join batches into one, merging their dictionaries.
+
+        Args:
+            batches (Sequence[TransactionBatch]): Batches to join
+
+        Returns:
+            TransactionBatch: Transactions of all the batches, in order
+        """
+        if not batches:
+            raise ValueError("No batches to concatenate")
+        codes, dictionaries = {}, {}
+        for name, dtype in DICTIONARY_COLUMNS.items():
+            merged = pd.Index(
+                [value for batch in batches
+                 for value in batch.dictionaries[name]],
+                dtype=object).unique()
+            recoded = []
+            for batch in batches:
+                # Position of each value of the batch in the merged
+                # dictionary; missing values (-1) stay missing
+                lookup = np.append(
+                    merged.get_indexer(list(batch.dictionaries[name])), -1)
+                recoded.append(lookup[batch.codes[name]].astype(dtype))
+            codes[name] = np.concatenate(recoded)
+            dictionaries[name] = tuple(merged.tolist())
+        return cls(
+            ids=np.concatenate([batch.ids for batch in batches]),
+            amounts=np.concatenate([batch.amounts for batch in batches]),
+            dates=np.concatenate([batch.dates for batch in batches]),
+            posted_at=np.concatenate(
+                [batch.posted_at for batch in batches]),
+            codes=codes,
+            dictionaries=dictionaries)
+
+
+def _to_days(values) -> np.ndarray:
+    """Days since 1970-01-01 of datetimes, as int32."""
+    days = np.asarray(values, dtype="datetime64[ns]").astype("datetime64[D]")
+    return days.view(np.int64).astype(np.int32)
+
+
+def _to_microseconds(values) -> np.ndarray:
+    """Microseconds since the epoch of UTC datetimes, as int64."""
+    return (pd.DatetimeIndex(values).tz_convert("UTC").tz_localize(None)
+            .to_numpy(dtype="datetime64[us]").view(np.int64))
@@ -0,0 +1,57 @@
+from abc import ABC, abstractmethod
+import importlib
+
+
+# Extraction backends by name, imported on first use
+BACKENDS = {
+    "textract":
+        "openfinance.parser.textract.parser.FinancialStatementTextractParser",
+    "text_layer":
+        "openfinance.parser.text_layer.parser."
+        "FinancialStatementTextLayerParser",
+}
+
+
+class ExtractionBackend(ABC):
+    """
+    Abstract base class of the backends that extract the movements
+    tables of a PDF financial statement.
+
+    parse() returns a dictionary with at least the keys "success",
+    "input_path", "csv_paths" and "tables", or "success" set to False
+    and "error" when the statement could not be parsed. The tables have
+    the header row of the statement as column names, which is the shape
+    the preprocessors expect.
+
+    The "csv_paths" point into the temporary workspace of the backend,
+    which is removed by cleanup(), on leaving the context or when the
+    backend is garbage collected. Read or copy the files before then.
+    """
+
+    @abstractmethod
+    def parse(self) -> dict:
+        """Extract the tables of the statement."""
+        pass
+
+    def cleanup(self) -> None:
+        """Remove the temporary files and objects of the backend."""
+        pass
+
+    def __enter__(self) -> "ExtractionBackend":
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback) -> None:
+        self.cleanup()
+
+
+def get_backend(name: str) -> type[ExtractionBackend]:
+    """
+    Return the extraction backend class registered under a name.
+
+    Args:
+        name (str): "textract" or "text_layer"
+    """
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown extraction backend: {name}")
+    module_name, class_name = BACKENDS[name].rsplit(".", 1)
+    return getattr(importlib.import_module(module_name), class_name)
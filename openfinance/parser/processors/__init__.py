@@ -1,9 +1,21 @@
-from openfinance.parser.processors.itau import (
-    CreditCardItauStatementPreprocessor)
-from openfinance.parser.processors.nu_bank import (
-    CreditCardNuBankStatementPreprocessor)
+import importlib
+
+# The processors are imported on first access, so importing this
+# package does not load pandas and numpy
+_PROCESSORS = {
+    "CreditCardItauStatementPreprocessor":
+        "openfinance.parser.processors.itau",
+    "CreditCardNuBankStatementPreprocessor":
+        "openfinance.parser.processors.nu_bank",
+}
 
 __all__ = [
     "CreditCardItauStatementPreprocessor",
     "CreditCardNuBankStatementPreprocessor"
-]
\ No newline at end of file
+]
+
+
+def __getattr__(name: str):
+    if name in _PROCESSORS:
+        return getattr(importlib.import_module(_PROCESSORS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,7 +1,16 @@
-import pandas as pd
 from openfinance.parser.processors.processor import (
     FinancialStatementPreprocessor
 )
+from openfinance.parser.processors.schema import BankSchemaSpec
+
+
+# The Davivienda tables are not mapped yet: their columns are kept
+# as extracted
+DAVIVIENDA_SCHEMA = BankSchemaSpec(
+    bank_name="davivienda",
+    columns=(),
+    constants={"bank_name": "davivienda"},
+)
 
 
 class CreditCardDaviviendaStatementPreprocessor(FinancialStatementPreprocessor):
@@ -10,14 +19,4 @@ class CreditCardDaviviendaStatementPreprocessor(FinancialStatementPreprocessor):
     from PDF statements for credit cards.
     """
 
-    def __init__(self,
-                 input_path: str,
-                 csv_files: list[str],
-                 output_folder: str):
-        super().__init__(
-            input_path=input_path,
-            csv_files=csv_files,
-            output_folder=output_folder)
-
-    def preprocess(self, df: pd.DataFrame = None) -> pd.DataFrame:
-        return df
+    schema = DAVIVIENDA_SCHEMA
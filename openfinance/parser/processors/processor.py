@@ -1,26 +1,213 @@
-from abc import ABC, abstractmethod
+import csv
+import importlib.util
+import io
 import pandas as pd
 import os
 import logging
+from collections import Counter
+from openfinance.parser.processors.schema import BankSchemaSpec
+from openfinance.storage.dataset import StatementDataset
+from openfinance.storage.ledger import Ledger
 
 logger = logging.getLogger(__name__)
 
 
-class FinancialStatementPreprocessor(ABC):
-    """Abstract base class for financial statement preprocessors."""
+def _csv_engine(header: tuple[str, ...]) -> str:
+    """
+    Use the pyarrow parser when it is installed and the header has
+    unique, non-empty names, which it cannot rename as pandas does.
+    """
+    if importlib.util.find_spec("pyarrow") is None:
+        return "c"
+    if all(header) and len(set(header)) == len(header):
+        return "pyarrow"
+    return "c"
+
+
+def read_csv_header(csv_file: str) -> tuple[str, ...] | None:
+    """
+    Read only the header row of a CSV file.
+
+    Returns:
+        tuple: Column names, or None if the file is empty
+
+    Raises:
+        ValueError: If the file is not UTF-8 encoded
+    """
+    try:
+        with open(csv_file, newline="", encoding="utf-8") as file:
+            header = next(csv.reader(file), None)
+    except UnicodeDecodeError as e:
+        raise ValueError(f"{csv_file} is not a UTF-8 CSV file: {e}") from e
+    return tuple(header) if header else None
+
+
+def _read_table_rows(csv_file: str, header: tuple[str, ...]) -> str:
+    """
+    Return the rows of a table CSV file without its header row,
+    checking that the header is the expected one.
+    """
+    try:
+        with open(csv_file, newline="", encoding="utf-8") as file:
+            text = file.read()
+    except UnicodeDecodeError as e:
+        raise ValueError(f"{csv_file} is not a UTF-8 CSV file: {e}") from e
+
+    reader = csv.reader(io.StringIO(text))
+    file_header = tuple(next(reader, None) or ())
+    if file_header != header:
+        raise ValueError(
+            f"{csv_file} has the header {list(file_header)}, "
+            f"expected {list(header)}")
+    # A quoted name may spread the header over several lines
+    position = 0
+    for _ in range(reader.line_num):
+        position = text.find("\n", position) + 1
+        if not position:
+            return ""
+    rows = text[position:]
+    # An unterminated quote would swallow the rows of the next files
+    if rows.count('"') % 2:
+        raise ValueError(f"{csv_file} has an unterminated quoted field")
+    return rows if not rows or rows.endswith("\n") else rows + "\n"
+
+
+def _raise_parse_error(
+        csv_files: list[str],
+        header: tuple[str, ...],
+        error: Exception = None) -> None:
+    """
+    Raise a ValueError naming the first file with a row longer than
+    the header, the rows the parsers reject.
+    """
+    for csv_file in csv_files:
+        with open(csv_file, newline="", encoding="utf-8") as file:
+            reader = csv.reader(file)
+            next(reader, None)
+            for row in reader:
+                if len(row) > len(header):
+                    raise ValueError(
+                        f"{csv_file} could not be read: line "
+                        f"{reader.line_num} has {len(row)} fields, "
+                        f"expected {len(header)}") from error
+    raise ValueError(
+        f"The table CSV files could not be read: {error}") from error
+
+
+def read_table_csvs(
+        csv_files: list[str],
+        header: tuple[str, ...]) -> pd.DataFrame:
+    """
+    Read table CSV files that share a header as a single table, with
+    every column as text, which is what the parsers of the schema
+    expect. The header row of each file is checked and stripped, and
+    the rows of all the files are parsed at once, with the pyarrow
+    parser when it can be used. Rows shorter than the header, as in
+    pages with a narrower second table, are filled with NaN.
+
+    Args:
+        csv_files (list[str]): Paths to the CSV files
+        header (tuple): Header row shared by the files
+
+    Returns:
+        pd.DataFrame: Rows of all the files, in order
+
+    Raises:
+        ValueError: If a file is not UTF-8 encoded, does not start with
+            the header or has rows that cannot be parsed
+    """
+    if not csv_files:
+        return pd.DataFrame(columns=list(header))
+    buffer = io.StringIO()
+    csv.writer(buffer, lineterminator="\n").writerow(header)
+    for csv_file in csv_files:
+        buffer.write(_read_table_rows(csv_file, header))
+    data = buffer.getvalue().encode("utf-8")
+
+    if _csv_engine(header) == "pyarrow":
+        try:
+            return pd.read_csv(io.BytesIO(data), dtype=str, engine="pyarrow")
+        except pd.errors.ParserError:
+            # pyarrow rejects short rows, which the C parser fills
+            logger.debug("Reading the table CSV files with the C parser")
+    try:
+        df = pd.read_csv(io.BytesIO(data), dtype=str, engine="c")
+    except pd.errors.ParserError as e:
+        _raise_parse_error(csv_files, header, e)
+    if not isinstance(df.index, pd.RangeIndex):
+        # The C parser turns the extra fields of long rows into an index
+        _raise_parse_error(csv_files, header)
+    return df
+
+
+class FinancialStatementPreprocessor:
+    """
+    Base class for financial statement preprocessors. The statement
+    tables are processed by the plan compiled from the schema of the
+    bank: subclasses set schema, or a schema is given to the
+    constructor for banks described only as data.
+    """
+
+    schema: BankSchemaSpec = None
+
+    # Output columns stored as categories in low-memory mode: few
+    # distinct values repeated over many rows
+    CATEGORICAL_COLUMNS = ["bank_name", "description"]
+    # Output integer columns downcast in low-memory mode
+    SMALL_INTEGER_COLUMNS = [
+        "current_installment_number", "total_installments"]
 
     def __init__(self,
                  input_path: str,
-                 csv_files: list[str],
-                 output_folder: str):
+                 csv_files: list[str] | None,
+                 output_folder: str,
+                 tables: list[pd.DataFrame] = None,
+                 low_memory: bool = False,
+                 schema: BankSchemaSpec = None):
+        """
+        Initialize the FinancialStatementPreprocessor.
+
+        Args:
+            input_path (str): Path to the original PDF statement
+            csv_files (list[str] | None): Table CSV files extracted from
+                the statement. Ignored when tables is given.
+            output_folder (str): Folder where the processed CSV is saved
+            tables (list[pd.DataFrame], optional): Tables extracted from
+                the statement, used in place of csv_files
+            low_memory (bool): Preprocess the frame in place instead of
+                on copies, release the tables and the intermediate frame
+                as soon as possible and store repeated strings and small
+                integers with compact dtypes. Only processed_df is kept.
+            schema (BankSchemaSpec, optional): Schema of the bank, in
+                place of the schema of the class
+        """
         self.input_path = input_path
         self.csv_files = csv_files
         self.output_folder = output_folder
+        self.tables = tables
+        self.low_memory = low_memory
+        self.df = None
+        self.processed_df = None
+        self.schema = schema or self.schema
+        if self.schema is None:
+            raise ValueError(
+                f"No schema to preprocess with {type(self).__name__}")
+        self.plan = self.schema.compile()
 
-    @abstractmethod
-    def preprocess(self, df: pd.DataFrame) -> pd.DataFrame:
-        """Preprocess the financial statement data."""
-        return df
+    def preprocess(self, df: pd.DataFrame = None) -> pd.DataFrame:
+        """
+        Preprocess the financial statement data.
+
+        Args:
+            df (pd.DataFrame, optional): DataFrame to preprocess.
+                If None, uses self.df
+
+        Returns:
+            pd.DataFrame: Preprocessed DataFrame
+        """
+        self._load(df)
+        self.df = self.plan.execute(self.df, consume=self.low_memory)
+        return self._finish()
 
     def process_financial_statement(
         self
@@ -31,11 +218,7 @@ class FinancialStatementPreprocessor(ABC):
         Returns:
             str: Path to the final processed CSV file
         """
-        logger.info("Preprocessing CSV files ...")
-        df = self.concatenate_csv_files(
-            csv_files=self.csv_files
-        )
-        df = self.preprocess(df)
+        df = self._preprocess_statement()
         self.output_csv_path = (
             f"{self.output_folder}/{os.path.basename(self.input_path)}.csv")
         df.to_csv(self.output_csv_path, index=False)
@@ -43,22 +226,168 @@ class FinancialStatementPreprocessor(ABC):
         logger.info(f"CSV file saved to {self.output_csv_path}")
         return self.output_csv_path
 
+    def process_financial_statement_to_dataset(
+            self,
+            dataset: StatementDataset,
+            product: str,
+            month: str = None) -> str:
+        """
+        Preprocess the statement and write the result to a partitioned
+        dataset instead of a CSV file.
+
+        Args:
+            dataset (StatementDataset): Dataset to write to
+            product (str): Product of the statement, e.g. "credit_card"
+            month (str, optional): Statement month as "YYYY-MM", taken
+                from the movements if None
+
+        Returns:
+            str: Path to the Parquet file of the statement
+        """
+        df = self._preprocess_statement()
+        self.output_dataset_path = dataset.write(
+            df,
+            bank=self.schema.bank_name,
+            product=product,
+            name=os.path.basename(self.input_path),
+            month=month)
+        return self.output_dataset_path
+
+    def process_financial_statement_to_ledger(
+            self,
+            ledger: Ledger,
+            account_id: str) -> dict:
+        """
+        Preprocess the statement and add its movements to a ledger,
+        where the movements of overlapping statements are stored once.
+
+        Args:
+            ledger (Ledger): Ledger to add the movements to
+            account_id (str): Account or card of the statement
+
+        Returns:
+            dict: Number of "inserted" movements and of "duplicates"
+                already in the ledger
+        """
+        df = self._preprocess_statement()
+        return ledger.upsert(
+            df,
+            account_id=account_id,
+            bank=self.schema.bank_name,
+            source=os.path.basename(self.input_path))
+
+    def _preprocess_statement(self) -> pd.DataFrame:
+        """Concatenate the tables or CSV files and preprocess them."""
+        if self.tables is not None:
+            logger.info("Preprocessing tables ...")
+            df = self.concatenate_tables(tables=self.tables)
+        else:
+            logger.info("Preprocessing CSV files ...")
+            df = self.concatenate_csv_files(
+                csv_files=self.csv_files
+            )
+        if self.low_memory:
+            # Hand the only reference to the frame over to preprocess,
+            # so each step can release the previous version of it
+            self.tables = None
+            self.df, df = df, None
+        return self.preprocess(df)
+
+    def _load(self, df: pd.DataFrame = None) -> None:
+        """
+        Take the frame to preprocess. The plan leaves it unchanged,
+        except in low-memory mode, where its columns are released as
+        they are parsed.
+        """
+        if df is not None:
+            self.df = df
+
+        if self.df is None:
+            raise ValueError(
+                "No DataFrame to preprocess. "
+                "Call concatenate_csv_files first.")
+
+    def _finish(self) -> pd.DataFrame:
+        """
+        Keep the preprocessed frame as the result. In low-memory mode the
+        frame is compacted and kept only once, as processed_df.
+        """
+        if self.low_memory:
+            self.processed_df = self.compact_dtypes(self.df)
+            self.df = None
+        else:
+            self.processed_df = self.df.copy()
+        return self.processed_df
+
+    def compact_dtypes(self, df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Store the repeated strings of a processed frame as categories
+        and downcast its small integer columns, in place.
+        """
+        for column in self.CATEGORICAL_COLUMNS:
+            if column in df.columns:
+                df[column] = df[column].astype("category")
+        for column in self.SMALL_INTEGER_COLUMNS:
+            if column in df.columns:
+                df[column] = pd.to_numeric(df[column], downcast="integer")
+        return df
+
     def concatenate_csv_files(
         self,
         csv_files: list[str],
     ) -> pd.DataFrame:
         """
         Concatenate multiple CSV files into a single DataFrame.
-        If the CSV files have different columns,
+        Only the header of each file is read first; the most common
+        header is the schema of the statement and only the files with
+        that header are loaded, as one table. The other files hold
+        other tables and are logged and skipped.
+
+        Raises:
+            ValueError: If a file is not UTF-8 encoded, or a file with
+                the statement header cannot be parsed
+        """
+        headers = [(csv_file, read_csv_header(csv_file))
+                   for csv_file in csv_files]
+        counts = Counter(header for _, header in headers if header)
+        if not counts:
+            return self.concatenate_tables([])
+        schema = counts.most_common(1)[0][0]
+
+        selected = []
+        for csv_file, header in headers:
+            if header == schema:
+                selected.append(csv_file)
+            elif header is None:
+                logger.warning(f"Skipping {csv_file}: the file is empty")
+            elif set(header) == set(schema):
+                logger.warning(
+                    f"Skipping {csv_file}: its columns are in a different "
+                    f"order than the statement columns {list(schema)}")
+            else:
+                missing = [name for name in schema if name not in header]
+                extra = [name for name in header if name not in schema]
+                logger.warning(
+                    f"Skipping {csv_file}: its header does not match the "
+                    f"statement columns (missing {missing}, extra {extra})")
+
+        return read_table_csvs(selected, schema)
+
+    def concatenate_tables(
+        self,
+        tables: list[pd.DataFrame],
+    ) -> pd.DataFrame:
+        """
+        Concatenate multiple tables into a single DataFrame.
+        If the tables have different columns,
         the function will return a DataFrame with the most common columns.
         """
-        dfs = [pd.read_csv(f) for f in csv_files]
+        dfs = tables
         # Only merge dataframes in dfs that have the same columns
         if dfs:
             # Find the set of columns for each dataframe
             columns_list = [tuple(df.columns) for df in dfs]
             # Find the most common columns set (mode)
-            from collections import Counter
             most_common_columns = Counter(columns_list).most_common(1)[0][0]
             # Filter dfs to only those with the most common columns
             dfs_same_cols = [
@@ -0,0 +1,173 @@
+from typing import NamedTuple
+import numpy as np
+import pandas as pd
+from openfinance.parser.processors.parsing import (
+    first_token,
+    parse_dates,
+    parse_installments,
+    parse_money,
+    parse_percent,
+    second_token)
+
+
+class ColumnSpec(NamedTuple):
+    """
+    One output column of a bank schema: the extracted column it is read
+    from and how its values are parsed.
+
+    parser is one of PARSERS: "raw" keeps the values, "text" strips
+    them, "money", "percent" and "date" parse them (date needs
+    date_format) and "installments" reads the "current" or "total"
+    part of "3 de 12". token keeps only the first (0) or second (1)
+    space-separated token before parsing. Optional columns that are not
+    in the table are skipped; missing required ones are an error.
+    """
+    name: str
+    source: str
+    parser: str = "raw"
+    token: int | None = None
+    date_format: str | None = None
+    part: str | None = None
+    optional: bool = False
+
+
+class BankSchemaSpec(NamedTuple):
+    """
+    Declarative description of how the tables of a bank statement are
+    turned into the processed movements.
+
+    Output columns come in the order of columns, followed by the
+    extracted columns no spec reads nor drop_columns lists (unchanged)
+    and the constants. Rows where any of the drop_missing columns is
+    empty are dropped before parsing.
+    """
+    bank_name: str
+    columns: tuple[ColumnSpec, ...]
+    drop_columns: tuple[str, ...] = ()
+    drop_missing: tuple[str, ...] = ()
+    constants: dict | None = None
+
+    def compile(self) -> "TransformationPlan":
+        """Validate the spec and compile it into an execution plan."""
+        return TransformationPlan(self)
+
+
+PARSERS = {
+    "raw": lambda values, spec: values,
+    "text": lambda values, spec: values.astype(str).str.strip(),
+    "money": lambda values, spec: parse_money(values),
+    "percent": lambda values, spec: parse_percent(values),
+    "date": lambda values, spec: parse_dates(values, spec.date_format),
+    "installments": lambda values, spec: parse_installments(values),
+}
+
+TOKENS = {0: first_token, 1: second_token}
+
+
+class TransformationPlan:
+    """
+    Execution plan of a BankSchemaSpec. The specs are grouped by the
+    extracted column they read, so each column is read, tokenized and
+    parsed once however many outputs it feeds, and the processed frame
+    is built in a single step from the parsed columns.
+    """
+
+    def __init__(self, spec: BankSchemaSpec):
+        """
+        Initialize the TransformationPlan.
+
+        Args:
+            spec (BankSchemaSpec): Schema of the bank
+
+        Raises:
+            ValueError: If a column spec is not valid
+        """
+        for column in spec.columns:
+            if column.parser not in PARSERS:
+                raise ValueError(
+                    f"Unknown parser {column.parser} for {column.name}")
+            if column.token is not None and column.token not in TOKENS:
+                raise ValueError(
+                    f"Unknown token {column.token} for {column.name}")
+            if column.parser == "date" and not column.date_format:
+                raise ValueError(f"Missing date format for {column.name}")
+            if (column.parser == "installments"
+                    and column.part not in ("current", "total")):
+                raise ValueError(
+                    f"Installment part of {column.name} must be "
+                    f"'current' or 'total'")
+
+        self.spec = spec
+        self.steps = {}
+        for column in spec.columns:
+            self.steps.setdefault(column.source, []).append(column)
+
+    def execute(
+            self,
+            df: pd.DataFrame,
+            consume: bool = False) -> pd.DataFrame:
+        """
+        Run the plan on a concatenated statement table.
+
+        Args:
+            df (pd.DataFrame): Table extracted from the statement
+            consume (bool): Delete each column from df once it is
+                parsed, so its memory is released as the plan runs.
+                df is left unchanged otherwise.
+
+        Returns:
+            pd.DataFrame: Processed movements
+
+        Raises:
+            ValueError: If a required column is not in the table
+        """
+        missing = [
+            column.source for column in self.spec.columns
+            if not column.optional and column.source not in df.columns]
+        if missing:
+            raise ValueError(
+                f"Missing columns for {self.spec.bank_name}: "
+                f"{sorted(set(missing))}")
+
+        drop = [name for name in self.spec.drop_missing if name in df.columns]
+        if drop:
+            keep = df[drop].notna().all(axis=1).to_numpy()
+            if not keep.all():
+                if consume and df.index.is_unique:
+                    # In place, so the unfiltered rows are released
+                    df.drop(index=df.index[~keep], inplace=True)
+                else:
+                    df = df.take(np.flatnonzero(keep))
+
+        parsed = {}
+        for source, columns in self.steps.items():
+            if source not in df.columns:
+                continue
+            values = df[source]
+            if consume:
+                del df[source]
+            results = {}
+            for column in columns:
+                key = (column.token, column.parser, column.date_format)
+                if key not in results:
+                    tokens = (values if column.token is None
+                              else TOKENS[column.token](values))
+                    results[key] = PARSERS[column.parser](tokens, column)
+                result = results[key]
+                if column.parser == "installments":
+                    result = result[column.part]
+                parsed[column.name] = result
+
+        # The parsed columns first, in the order of the spec
+        output = pd.DataFrame(
+            {column.name: parsed[column.name]
+             for column in self.spec.columns if column.name in parsed},
+            index=df.index)
+        for source in df.columns:
+            if (source not in self.steps
+                    and source not in self.spec.drop_columns
+                    and source not in output.columns):
+                output[source] = df[source]
+        for name, value in (self.spec.constants or {}).items():
+            output[name] = value
+        return output
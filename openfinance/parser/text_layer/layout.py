@@ -0,0 +1,550 @@
+import math
+import re
+from typing import NamedTuple
+import pandas as pd
+from openfinance.parser.textract.page_filter import (
+    ROW_DATE_PATTERNS,
+    normalize_bank_name,
+    strip_accents)
+
+
+# Columns of the movements table of each bank, in the order Textract
+# returns them, with a pattern matched against the header text of the
+# column (lowercase, without accents). The names are the ones the
+# preprocessors expect.
+TABLE_LAYOUTS = {
+    "itau": [
+        ("Fecha", r"^fecha"),
+        ("Número de Comprobante", r"comprobante"),
+        ("Descripción", r"descripcion"),
+        ("Valor original", r"valor original"),
+        ("Tasa EA", r"tasa"),
+        ("Cuotas", r"^cuotas"),
+        ("Valor cuota", r"valor cuota"),
+        ("Saldo pendiente", r"saldo"),
+    ],
+    "nu_bank": [
+        ("Fecha", r"^fecha"),
+        ("Descripción", r"descripcion"),
+        ("Valor", r"^valor$"),
+        ("Cuotas", r"^cuotas"),
+        ("Valor del mes", r"^valor del mes"),
+        ("Interés Porcentaje", r"porcentaje"),
+        ("del mes y valor", r"del mes y valor"),
+        ("Total a pagar este mes", r"total a pagar"),
+        ("Restante por pagar", r"restante"),
+    ],
+}
+
+# Header lines looked for above the first row of a table
+MAX_HEADER_LINES = 3
+# Vertical gap, in line heights, that ends a table or its header
+MAX_LINE_GAP = 2.5
+# Minimum columns found in the header to rebuild a table
+MIN_HEADER_COLUMNS = 3
+# Transformation matrix that leaves coordinates unchanged
+IDENTITY = (1.0, 0.0, 0.0, 1.0, 0.0, 0.0)
+# Glyph width, in thousandths of the font size, when the font has none
+DEFAULT_GLYPH_WIDTH = 500
+# TJ offsets, in thousandths of the font size, read as a space between
+# words and as the gap between two cells
+TJ_SPACE_OFFSET = 200
+TJ_NEW_RUN_OFFSET = 1000
+# Header names pandas gives to empty and repeated header cells
+UNNAMED_PATTERN = re.compile(r"^Unnamed: \d+$")
+REPEATED_PATTERN = re.compile(r"^(.*)\.\d+$")
+
+
+class TextRun(NamedTuple):
+    """Text drawn by one PDF text operator and its page position."""
+    x: float
+    y: float
+    text: str
+    font_size: float
+
+
+def get_layout(bank_name: str) -> list[tuple[str, str]] | None:
+    """Return the table layout of a bank, or None if it has none."""
+    return TABLE_LAYOUTS.get(normalize_bank_name(bank_name))
+
+
+def match_columns(
+        headers: list[str],
+        layout: list[tuple[str, str]]) -> dict[int, str]:
+    """
+    Match header texts to the columns of a layout, each header to at
+    most one column.
+
+    Returns:
+        dict: Layout column name of the position of each matched header
+    """
+    texts = {i: strip_accents(str(header)) for i, header in enumerate(headers)}
+    matched = {}
+    for name, pattern in layout:
+        for i, text in texts.items():
+            if i not in matched and re.search(pattern, text):
+                matched[i] = name
+                break
+    return matched
+
+
+def map_table_columns(
+        table: pd.DataFrame,
+        bank_name: str) -> pd.DataFrame | None:
+    """
+    Map a table read by Textract onto the columns of the bank layout,
+    so it matches the tables rebuilt from the text layer.
+
+    Textract uses the first row of a table as its header. When that row
+    names fewer than MIN_HEADER_COLUMNS layout columns but the table
+    has as many columns as the layout, it is a continuation table
+    without header: its first row is data and the columns are taken
+    by position.
+
+    Args:
+        table (pd.DataFrame): Table returned by the Textract parser
+        bank_name (str): Name of the bank
+
+    Returns:
+        pd.DataFrame | None: Table with the layout columns, the table
+        unchanged if the bank has no layout, or None if it is not a
+        movements table
+    """
+    layout = get_layout(bank_name)
+    if layout is None:
+        return table
+    names = [name for name, _ in layout]
+    headers = list(table.columns)
+
+    matched = match_columns(headers, layout)
+    if len(matched) >= MIN_HEADER_COLUMNS:
+        rows = table.iloc[:, list(matched)]
+        rows.columns = list(matched.values())
+        return rows.reindex(columns=names).astype(object)
+
+    if len(headers) == len(names):
+        first_row = []
+        for header in headers:
+            header = str(header)
+            repeated = REPEATED_PATTERN.match(header)
+            if UNNAMED_PATTERN.match(header):
+                first_row.append(None)
+            elif repeated and repeated.group(1) in first_row:
+                first_row.append(repeated.group(1))
+            else:
+                first_row.append(header)
+        rows = pd.DataFrame(
+            [first_row] + table.values.tolist(), columns=names, dtype=object)
+        return rows
+    return None
+
+
+def extract_text_runs(page) -> list[TextRun]:
+    """
+    Extract the positioned text runs of a PyPDF2 page by walking its
+    content stream and tracking the text matrix, so every string is
+    placed where it is drawn, also when a whole row is written inside
+    one BT/ET block with Td, Tm or TJ offsets. Form XObjects are
+    walked too.
+
+    Returns:
+        list: Non-blank text runs in page coordinates
+    """
+    from PyPDF2.generic import ContentStream
+
+    contents = page.get_contents()
+    if contents is None:
+        return []
+    runs = []
+    _walk_text(ContentStream(contents, page.pdf, "bytes"),
+               page.get("/Resources"), IDENTITY, page.pdf, runs)
+    return runs
+
+
+class _Font:
+    """Decoding and glyph widths of a font of the page resources."""
+
+    def __init__(self, name: str, resources):
+        from PyPDF2._cmap import build_char_map
+
+        # The same character maps PyPDF2 uses to extract text
+        font_type, _, self.encoding, self.unicode_map, font = (
+            build_char_map(name, 200.0, {"/Resources": resources}))
+        self.two_bytes = font_type == "/Type0"
+        self.widths = {}
+        self.default_width = DEFAULT_GLYPH_WIDTH
+        if self.two_bytes:
+            descendant = (
+                font["/DescendantFonts"].get_object()[0].get_object())
+            self.default_width = float(descendant.get("/DW", 1000))
+            widths = descendant.get("/W")
+            widths = [item.get_object() for item in
+                      (widths.get_object() if widths is not None else [])]
+            i = 0
+            while i + 1 < len(widths):
+                if isinstance(widths[i + 1], list):
+                    for offset, width in enumerate(widths[i + 1]):
+                        self.widths[int(widths[i]) + offset] = float(width)
+                    i += 2
+                else:
+                    for code in range(int(widths[i]), int(widths[i + 1]) + 1):
+                        self.widths[code] = float(widths[i + 2])
+                    i += 3
+        else:
+            first_char = int(font.get("/FirstChar", 0))
+            widths = font.get("/Widths")
+            for offset, width in enumerate(
+                    widths.get_object() if widths is not None else []):
+                self.widths[first_char + offset] = float(width)
+
+    def codes(self, data: bytes) -> list[int]:
+        if self.two_bytes:
+            return [int.from_bytes(data[i:i + 2], "big")
+                    for i in range(0, len(data) - 1, 2)]
+        return list(data)
+
+    def decode(self, data: bytes) -> str:
+        if isinstance(self.encoding, str):
+            try:
+                text = data.decode(self.encoding, "surrogatepass")
+            except UnicodeDecodeError:
+                text = data.decode(
+                    "utf-16-be" if self.encoding == "charmap" else "charmap",
+                    "surrogatepass")
+        else:
+            text = "".join(self.encoding.get(code, chr(code))
+                           for code in data)
+        return "".join(self.unicode_map.get(char, char) for char in text)
+
+    def advance(self, data: bytes, font_size: float, char_spacing: float,
+                word_spacing: float) -> float:
+        """Horizontal advance of a string, in unscaled text space."""
+        codes = self.codes(data)
+        width = sum(self.widths.get(code, self.default_width)
+                    for code in codes) / 1000 * font_size
+        spaces = 0 if self.two_bytes else codes.count(32)
+        return width + char_spacing * len(codes) + word_spacing * spaces
+
+
+def _multiply(m: tuple, n: tuple) -> tuple:
+    """Product of two PDF transformation matrices, m x n."""
+    return (
+        m[0] * n[0] + m[1] * n[2],
+        m[0] * n[1] + m[1] * n[3],
+        m[2] * n[0] + m[3] * n[2],
+        m[2] * n[1] + m[3] * n[3],
+        m[4] * n[0] + m[5] * n[2] + n[4],
+        m[4] * n[1] + m[5] * n[3] + n[5],
+    )
+
+
+def _walk_text(
+        content,
+        resources,
+        ctm: tuple,
+        pdf,
+        runs: list[TextRun]) -> None:
+    """
+    Add the text runs drawn by a content stream to runs, in the
+    coordinates given by ctm.
+    """
+    from PyPDF2.generic import ContentStream
+
+    resources = resources.get_object() if resources is not None else {}
+    fonts = {}
+
+    def get_font(name: str) -> _Font | None:
+        if name not in fonts:
+            try:
+                fonts[name] = _Font(name, resources)
+            except Exception:
+                # Unknown or broken font, read as Latin-1
+                fonts[name] = None
+        return fonts[name]
+
+    state = {"font": None, "size": 1.0, "char_spacing": 0.0,
+             "word_spacing": 0.0, "scale": 1.0, "leading": 0.0}
+    stack = []
+    tm = tlm = IDENTITY
+    run = None
+
+    def flush() -> None:
+        nonlocal run
+        if run is not None and run[2].strip():
+            runs.append(TextRun(run[0], run[1], run[2].strip(), run[3]))
+        run = None
+
+    def show(data) -> None:
+        nonlocal tm, run
+        font = state["font"]
+        if isinstance(data, str):
+            data = data.encode("latin-1", "replace")
+        text = font.decode(data) if font else data.decode("latin-1")
+        if run is None:
+            m = _multiply(tm, ctm)
+            size = state["size"] * (math.hypot(m[2], m[3]) or 1.0)
+            run = [m[4], m[5], "", size]
+        run[2] += text
+        advance = (
+            font.advance(data, state["size"], state["char_spacing"],
+                         state["word_spacing"])
+            if font else len(data) * DEFAULT_GLYPH_WIDTH / 1000
+            * state["size"])
+        tm = _multiply((1, 0, 0, 1, advance * state["scale"], 0), tm)
+
+    def move(tx: float, ty: float) -> None:
+        nonlocal tm, tlm
+        tlm = _multiply((1, 0, 0, 1, tx, ty), tlm)
+        tm = tlm
+
+    for operands, operator in content.operations:
+        if operator == b"BT":
+            tm = tlm = IDENTITY
+        elif operator == b"ET":
+            flush()
+        elif operator == b"q":
+            stack.append((ctm, dict(state)))
+        elif operator == b"Q":
+            if stack:
+                ctm, state = stack.pop()
+        elif operator == b"cm":
+            ctm = _multiply(tuple(float(value) for value in operands), ctm)
+        elif operator == b"Tf":
+            state["font"] = get_font(operands[0])
+            state["size"] = float(operands[1])
+        elif operator == b"Tc":
+            state["char_spacing"] = float(operands[0])
+        elif operator == b"Tw":
+            state["word_spacing"] = float(operands[0])
+        elif operator == b"Tz":
+            state["scale"] = float(operands[0]) / 100
+        elif operator == b"TL":
+            state["leading"] = float(operands[0])
+        elif operator in (b"Td", b"TD"):
+            flush()
+            if operator == b"TD":
+                state["leading"] = -float(operands[1])
+            move(float(operands[0]), float(operands[1]))
+        elif operator == b"Tm":
+            flush()
+            tm = tlm = tuple(float(value) for value in operands)
+        elif operator == b"T*":
+            flush()
+            move(0, -state["leading"])
+        elif operator == b"Tj":
+            flush()
+            show(operands[0])
+            flush()
+        elif operator in (b"'", b'"'):
+            flush()
+            if operator == b'"':
+                state["word_spacing"] = float(operands[0])
+                state["char_spacing"] = float(operands[1])
+            move(0, -state["leading"])
+            show(operands[-1])
+            flush()
+        elif operator == b"TJ":
+            flush()
+            for item in operands[0]:
+                if isinstance(item, (bytes, str)):
+                    show(item)
+                    continue
+                # Offsets are in thousandths of the font size: a word
+                # space keeps the run, a wider gap or a move back
+                # starts another one
+                offset = -float(item)
+                if abs(offset) >= TJ_NEW_RUN_OFFSET:
+                    flush()
+                elif offset >= TJ_SPACE_OFFSET and run is not None:
+                    run[2] += " "
+                tm = _multiply(
+                    (1, 0, 0, 1, offset / 1000 * state["size"]
+                     * state["scale"], 0), tm)
+            flush()
+        elif operator == b"Do":
+            flush()
+            try:
+                xobject = resources["/XObject"][operands[0]].get_object()
+            except KeyError:
+                continue
+            if xobject.get("/Subtype") != "/Form":
+                continue
+            matrix = tuple(
+                float(value)
+                for value in xobject.get("/Matrix", IDENTITY))
+            _walk_text(ContentStream(xobject, pdf, "bytes"),
+                       xobject.get("/Resources", resources),
+                       _multiply(matrix, ctm), pdf, runs)
+    flush()
+
+
+def group_lines(runs: list[TextRun]) -> list[list[TextRun]]:
+    """
+    Group text runs into lines from the top of the page down,
+    each line sorted from left to right.
+    """
+    lines = []
+    for run in sorted(runs, key=lambda run: (-run.y, run.x)):
+        tolerance = run.font_size * 0.5
+        if lines and abs(lines[-1][0].y - run.y) <= tolerance:
+            lines[-1].append(run)
+        else:
+            lines.append([run])
+    return [sorted(line, key=lambda run: run.x) for line in lines]
+
+
+def merge_phrases(line: list[TextRun]) -> list[TextRun]:
+    """
+    Join the runs of a line that are separated by about a space,
+    so a header or a description written word by word becomes
+    one phrase. The width of a run is only estimated from its font
+    size, so runs that overlap the estimate by more than half a
+    character are not joined.
+    """
+    phrases = []
+    for run in line:
+        if phrases:
+            last = phrases[-1]
+            width = len(last.text) * last.font_size * 0.5
+            gap = run.x - (last.x + width)
+            if -0.5 * last.font_size <= gap <= last.font_size * 0.6:
+                phrases[-1] = last._replace(text=f"{last.text} {run.text}")
+                continue
+        phrases.append(run)
+    return phrases
+
+
+def find_columns(
+        header_lines: list[list[TextRun]],
+        layout: list[tuple[str, str]]) -> list[tuple[str, float]]:
+    """
+    Locate the columns of a layout in the header lines of a table.
+    Header cells written on several lines are joined first.
+
+    Returns:
+        list: (column name, x position) of the columns found, by position
+    """
+    cells = []
+    for line in header_lines:
+        for phrase in merge_phrases(line):
+            tolerance = phrase.font_size
+            for cell in cells:
+                if abs(cell[0] - phrase.x) <= tolerance:
+                    cell[1].append(phrase.text)
+                    break
+            else:
+                cells.append((phrase.x, [phrase.text]))
+
+    columns = []
+    for name, pattern in layout:
+        for cell in cells:
+            x, texts = cell
+            if re.search(pattern, strip_accents(" ".join(texts))):
+                columns.append((name, x))
+                cells.remove(cell)
+                break
+    return sorted(columns, key=lambda column: column[1])
+
+
+def assign_column(
+        run: TextRun,
+        columns: list[tuple[str, float]]) -> str:
+    """
+    Return the column of a text run: the last one starting left of it.
+    Runs may start up to two characters left of their header, as
+    right-aligned amounts often do.
+    """
+    position = run.x + run.font_size
+    name = columns[0][0]
+    for column_name, x in columns:
+        if x <= position:
+            name = column_name
+    return name
+
+
+def header_lines(
+        lines: list[list[TextRun]],
+        first_row: int) -> list[list[TextRun]]:
+    """
+    Return the lines right above the first row of a table that
+    can belong to its header, from the top down.
+    """
+    header = []
+    below = lines[first_row]
+    for line in reversed(lines[max(0, first_row - MAX_HEADER_LINES):
+                               first_row]):
+        line_height = max(run.font_size for run in line)
+        if line[0].y - below[0].y > MAX_LINE_GAP * line_height:
+            break
+        header.insert(0, line)
+        below = line
+    return header
+
+
+def rebuild_table(
+        runs: list[TextRun],
+        bank_name: str,
+        columns: list[tuple[str, float]] = None
+) -> tuple[pd.DataFrame | None, list[tuple[str, float]] | None]:
+    """
+    Rebuild the movements table of a page from its text runs.
+
+    Rows start on the lines whose first cell is a date; the lines that
+    follow a row without a date continue its cells (multi-line
+    descriptions). The column positions are read from the header above
+    the first row, or taken from the previous page when the table
+    continues without a header.
+
+    Args:
+        runs (list): Text runs of the page
+        bank_name (str): Name of the bank
+        columns (list, optional): Columns found on the previous page
+
+    Returns:
+        tuple: (table, columns). The table is None if the page has no
+        movements; the columns are None if none could be located.
+    """
+    layout = get_layout(bank_name)
+    if layout is None:
+        raise ValueError(f"No text layer layout for bank {bank_name}")
+    date_pattern = ROW_DATE_PATTERNS[normalize_bank_name(bank_name)]
+
+    lines = group_lines(runs)
+    row_starts = [
+        i for i, line in enumerate(lines)
+        if date_pattern.match(strip_accents(merge_phrases(line)[0].text))]
+    if not row_starts:
+        return None, columns
+
+    first_row = row_starts[0]
+    header_columns = find_columns(header_lines(lines, first_row), layout)
+    if len(header_columns) >= MIN_HEADER_COLUMNS:
+        columns = header_columns
+    if columns is None:
+        return None, None
+
+    rows = []
+    row = None
+    previous_y = None
+    for i, line in enumerate(lines[first_row:], start=first_row):
+        line_height = max(run.font_size for run in line)
+        if i in row_starts:
+            row = {}
+            rows.append(row)
+        elif (row is None
+              or previous_y - line[0].y > MAX_LINE_GAP * line_height):
+            # Footer or text after the table
+            row = None
+            continue
+        # Runs are placed one by one so cells never spill into
+        # the next column
+        for run in line:
+            name = assign_column(run, columns)
+            row[name] = f"{row[name]} {run.text}" if name in row else run.text
+        previous_y = line[0].y
+
+    names = [name for name, _ in layout]
+    table = pd.DataFrame(
+        [[row.get(name) for name in names] for row in rows],
+        columns=names, dtype=object)
+    return table, columns
@@ -0,0 +1,228 @@
+import logging
+import os
+import time
+import openfinance.constants as ct
+import openfinance.parser.textract.utils as ut
+from openfinance.files.workspace import JobWorkspace
+from openfinance.parser.backend import ExtractionBackend
+from openfinance.parser.text_layer.layout import (
+    extract_text_runs, get_layout, map_table_columns, rebuild_table)
+from openfinance.parser.textract.page_filter import classify_page
+
+
+logger = logging.getLogger(__name__)
+
+
+class FinancialStatementTextLayerParser(ExtractionBackend):
+    """
+    A class to parse financial statements from the text layer of the PDF,
+    without OCR or network calls. Pages without a text layer (scanned
+    pages) fall back to AWS Textract.
+    """
+
+    def __init__(
+            self,
+            input_path: str,
+            password: str,
+            bank_name: str,
+            temp_folder: str = ct.TEMP_FOLDER,
+            output_folder: str = ct.OUTPUT_FOLDER,
+            output_format: str = "csv",
+            fallback: bool = True,
+            **textract_options):
+        """
+        Initialize the FinancialStatementTextLayerParser.
+
+        Args:
+            input_path (str): Path to the encrypted PDF file
+            password (str): Password to decrypt the PDF
+            bank_name (str): Name of the bank
+            temp_folder (str): Path to the temporary folder. Each parser
+                works in its own job workspace inside this folder.
+            output_folder (str): Path to the output folder
+            output_format (str): "csv" writes one CSV per table to the
+                job workspace; "dataframe" keeps the tables in memory
+                as DataFrames, returned under the "tables" key. The
+                CSV files are removed with the workspace, by cleanup(),
+                on leaving the context or when the parser is garbage
+                collected, so they must be read or copied before.
+            fallback (bool): Analyze the pages that have no text layer,
+                or whose table could not be rebuilt, with Textract.
+            **textract_options: Arguments of the Textract parser used
+                for the fallback pages, e.g. max_workers or cache.
+        """
+        if output_format not in ("csv", "dataframe"):
+            raise ValueError(f"Unknown output format: {output_format}")
+
+        self.input_path = input_path
+        self.password = password
+        self.bank_name = bank_name
+        self.workspace = JobWorkspace(base_folder=temp_folder)
+        self.output_folder = output_folder
+        self.output_format = output_format
+        self.fallback = fallback
+        self.textract_options = textract_options
+        self.textract_parser = None
+        self.text_layer_pages = []
+        self.fallback_pages = []
+        self.csv_paths = []
+        self.tables = []
+
+    @property
+    def temp_folder(self) -> str:
+        """Folder of the job workspace, created on first use."""
+        return self.workspace.path
+
+    def cleanup(self) -> None:
+        """Remove the job workspace and the files of the fallback."""
+        if self.textract_parser is not None:
+            self.textract_parser.cleanup()
+        self.workspace.cleanup()
+
+    def extract_tables(self) -> list:
+        """
+        Rebuild the movements table of every page from its text layer.
+        Pages without text or without a recognizable table that may
+        still contain movements are kept for the fallback. Banks
+        without a table layout send every page to the fallback.
+
+        Returns:
+            list: DataFrames of the pages read from the text layer, one
+            per page of text_layer_pages
+        """
+        tables = []
+        columns = None
+        with ut.open_pdf(self.input_path, self.password) as reader:
+            if get_layout(self.bank_name) is None:
+                logger.info(
+                    f"No text layer layout for {self.bank_name}, "
+                    f"analyzing {self.input_path} with Textract")
+                self.fallback_pages = list(range(1, len(reader.pages) + 1))
+                return tables
+            logger.info(f"Reading the text layer of: {self.input_path}")
+            for page_number, page in enumerate(reader.pages, start=1):
+                start = time.perf_counter()
+                runs = extract_text_runs(page)
+                table, columns = rebuild_table(
+                    runs, self.bank_name, columns)
+                if table is not None and len(table):
+                    tables.append(table)
+                    self.text_layer_pages.append(page_number)
+                else:
+                    page_text = " ".join(run.text for run in runs)
+                    keep, reason = classify_page(page_text, self.bank_name)
+                    if keep:
+                        logger.info(
+                            f"Page {page_number} needs Textract: {reason}")
+                        self.fallback_pages.append(page_number)
+                logger.debug(
+                    f"Page {page_number} read in "
+                    f"{time.perf_counter() - start:.3f}s")
+        return tables
+
+    def analyze_fallback_pages(self) -> dict:
+        """
+        Analyze the pages that could not be read from the text layer
+        with a single Textract parser, which opens and splits the PDF
+        once. The tables are mapped onto the columns of the bank
+        layout, like the ones rebuilt from the text layer.
+
+        Returns:
+            dict: DataFrames of the tables found by Textract on each
+            page, by page number
+        """
+        from openfinance.parser.textract.parser import (
+            FinancialStatementTextractParser)
+
+        logger.info(
+            f"Analyzing pages {self.fallback_pages} with Textract ...")
+        self.textract_parser = FinancialStatementTextractParser(
+            input_path=self.input_path,
+            password=self.password,
+            bank_name=self.bank_name,
+            temp_folder=self.temp_folder,
+            output_folder=self.output_folder,
+            output_format="dataframe",
+            pages=self.fallback_pages,
+            **self.textract_options
+        )
+        results = self.textract_parser.parse()
+        if not results["success"]:
+            raise RuntimeError(results["error"])
+
+        page_tables = {}
+        for page_number, table in zip(
+                results["table_pages"], results["tables"]):
+            mapped = map_table_columns(table, self.bank_name)
+            if mapped is None:
+                logger.info(
+                    f"Skipping a table of page {page_number} without "
+                    f"the movements columns: {list(table.columns)}")
+            elif len(mapped):
+                page_tables.setdefault(page_number, []).append(mapped)
+        return page_tables
+
+    def save_tables_csv(self, tables: list) -> list:
+        """
+        Save each table to a CSV file in the workspace.
+
+        Returns:
+            list: List of paths to the CSV files
+        """
+        file_name = os.path.basename(self.input_path)
+        csv_paths = []
+        for index, table in enumerate(tables, start=1):
+            csv_path = os.path.join(
+                self.temp_folder, f"{file_name}_table_{index}.csv")
+            table.to_csv(csv_path, index=False)
+            csv_paths.append(csv_path)
+        return csv_paths
+
+    def parse(self) -> dict:
+        """
+        Parse the PDF file from its text layer, falling back to
+        Textract for the pages that need OCR. The tables are returned in
+        page order, whichever way each page was read.
+
+        Returns:
+            dict: Dictionary containing parsing results and file paths
+        """
+        try:
+            tables = self.extract_tables()
+            page_tables = {
+                page_number: [table] for page_number, table
+                in zip(self.text_layer_pages, tables)}
+            if self.fallback_pages and self.fallback:
+                page_tables.update(self.analyze_fallback_pages())
+            elif self.fallback_pages:
+                logger.warning(
+                    f"Pages {self.fallback_pages} could not be read "
+                    f"from the text layer and were skipped")
+            tables = [table for page_number in sorted(page_tables)
+                      for table in page_tables[page_number]]
+
+            if self.output_format == "dataframe":
+                self.tables = tables
+            else:
+                self.csv_paths = self.save_tables_csv(tables)
+            logger.info(
+                f"Extracted {len(tables)} tables, "
+                f"{len(self.text_layer_pages)} pages from the text layer "
+                f"and {len(self.fallback_pages)} with Textract")
+
+            return {
+                'success': True,
+                'input_path': self.input_path,
+                'csv_paths': self.csv_paths,
+                'tables': self.tables,
+                'text_layer_pages': self.text_layer_pages,
+                'textract_pages': self.fallback_pages
+            }
+
+        except Exception as e:
+            logger.error(f"Error parsing Financial Statement PDF: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e),
+                'input_path': self.input_path
+            }
@@ -1,6 +1,70 @@
+import base64
+import hashlib
+import logging
 import os
-from botocore.exceptions import BotoCoreError, ClientError
 import openfinance.constants as ct
+from openfinance.clients import get_s3_client, get_transfer_config
+from openfinance.files.utils import hash_file
+from openfinance.parser.textract.throttling import get_governor
+
+logger = logging.getLogger(__name__)
+
+
+def get_content_key(
+        file_path: str,
+        prefix: str = ct.TEXTRACT_CHUNKS_PREFIX) -> str:
+    """
+    Return the S3 object key of a file derived from its content,
+    so identical files are stored once whatever job uploads them.
+    """
+    extension = os.path.splitext(file_path)[1]
+    return f"{prefix}{hash_file(file_path)}{extension}"
+
+
+def head_s3_object(bucket_name: str, object_name: str) -> dict | None:
+    """
+    Return the metadata of an S3 object, or None if it does not exist.
+    """
+    from botocore.exceptions import ClientError
+
+    def head():
+        try:
+            return get_s3_client().head_object(
+                Bucket=bucket_name, Key=object_name)
+        except ClientError as e:
+            if e.response.get("Error", {}).get("Code") in (
+                    "404", "NoSuchKey", "NotFound"):
+                return None
+            raise
+
+    return get_governor("s3").call(head)
+
+
+def s3_object_matches(
+        file_path: str,
+        bucket_name: str,
+        object_name: str) -> bool:
+    """
+    Check if an S3 object already holds the content of a file,
+    comparing its ETag with the MD5 of the file.
+
+    Objects uploaded in parts have an ETag that is not the MD5 of their
+    content; their size is compared instead, as the key of a content
+    addressed object already identifies its content.
+    """
+    from botocore.exceptions import BotoCoreError, ClientError
+    try:
+        metadata = head_s3_object(bucket_name, object_name)
+    except (BotoCoreError, ClientError) as e:
+        logger.warning(f"Failed to check {object_name} in S3: {e}")
+        return False
+    if metadata is None:
+        return False
+
+    etag = metadata.get("ETag", "").strip('"')
+    if "-" in etag:
+        return metadata.get("ContentLength") == os.path.getsize(file_path)
+    return etag == hash_file(file_path, "md5")
 
 
 def upload_file_to_s3(
@@ -10,6 +74,10 @@ def upload_file_to_s3(
     """
     Upload a file to an S3 bucket.
 
+    Files below the multipart threshold are sent with a single
+    PutObject request; larger ones, such as multi-page documents,
+    go through the tuned multipart transfer configuration.
+
     Args:
         file_path (str): Path to the file to upload.
         bucket_name (str): Name of the S3 bucket.
@@ -19,12 +87,32 @@ def upload_file_to_s3(
     Returns:
         bool: True if file was uploaded, else False.
     """
+    from boto3.exceptions import S3UploadFailedError
+    from botocore.exceptions import BotoCoreError, ClientError
     if object_name is None:
         object_name = os.path.basename(file_path)
 
     try:
-        ct.s3_client.upload_file(file_path, bucket_name, object_name)
-    except (BotoCoreError, ClientError) as e:
-        print(f"Failed to upload {file_path} to S3: {e}")
+        if os.path.getsize(file_path) < ct.S3_MULTIPART_THRESHOLD:
+            with open(file_path, "rb") as f:
+                body = f.read()
+            get_governor("s3").call(
+                get_s3_client().put_object,
+                Bucket=bucket_name,
+                Key=object_name,
+                Body=body,
+                ContentMD5=base64.b64encode(
+                    hashlib.md5(body).digest()).decode()
+            )
+        else:
+            get_governor("s3").call(
+                get_s3_client().upload_file,
+                file_path,
+                bucket_name,
+                object_name,
+                Config=get_transfer_config())
+    except (BotoCoreError, ClientError, S3UploadFailedError) as e:
+        logger.warning(f"Failed to upload {file_path} to S3: {e}")
         return False
     return True
+
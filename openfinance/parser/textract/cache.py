@@ -0,0 +1,142 @@
+import gzip
+import hashlib
+import json
+import logging
+import os
+import threading
+import openfinance.constants as ct
+
+
+logger = logging.getLogger(__name__)
+
+
+class TextractCache:
+    """
+    Content-addressed on-disk cache of Textract responses.
+
+    Entries are keyed by the SHA-256 of the document bytes plus the
+    requested FeatureTypes and store the raw Blocks as gzipped JSON.
+    When the cache grows beyond max_size_bytes the least recently
+    used entries are evicted. The size is measured on disk, so several
+    processes sharing the folder enforce the same limit.
+    """
+
+    def __init__(
+            self,
+            cache_folder: str = ct.TEXTRACT_CACHE_FOLDER,
+            max_size_bytes: int = ct.TEXTRACT_CACHE_MAX_BYTES):
+        """
+        Initialize the TextractCache.
+
+        Args:
+            cache_folder (str): Folder where the entries are stored
+            max_size_bytes (int): Maximum total size of the entries
+        """
+        self.cache_folder = cache_folder
+        self.max_size_bytes = max_size_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        os.makedirs(self.cache_folder, exist_ok=True)
+
+    @staticmethod
+    def make_key(document_bytes: bytes, feature_types: list[str]) -> str:
+        """Build the cache key of a document and its FeatureTypes."""
+        digest = hashlib.sha256(document_bytes)
+        digest.update(",".join(sorted(feature_types)).encode("utf-8"))
+        return digest.hexdigest()
+
+    def key_for_file(self, file_path: str, feature_types: list[str]) -> str:
+        """Build the cache key of a document stored on disk."""
+        with open(file_path, "rb") as f:
+            return self.make_key(f.read(), feature_types)
+
+    def contains(self, key: str) -> bool:
+        """Check if an entry exists without counting a hit or miss."""
+        return os.path.exists(self._entry_path(key))
+
+    def get(self, key: str) -> list[dict] | None:
+        """
+        Return the cached Blocks for a key, or None on a miss.
+        """
+        entry_path = self._entry_path(key)
+        try:
+            with gzip.open(entry_path, "rt", encoding="utf-8") as f:
+                blocks = json.load(f)
+        except FileNotFoundError:
+            with self._lock:
+                self.misses += 1
+            return None
+
+        # Refresh the modification time, used as the LRU order
+        try:
+            os.utime(entry_path)
+        except FileNotFoundError:
+            pass
+        with self._lock:
+            self.hits += 1
+        return blocks
+
+    def put(self, key: str, blocks: list[dict]) -> None:
+        """
+        Store the Blocks of a Textract response and evict old entries
+        if the cache exceeds its maximum size.
+        """
+        entry_path = self._entry_path(key)
+        tmp_path = f"{entry_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        payload = json.dumps(blocks, separators=(",", ":")).encode("utf-8")
+        with open(tmp_path, "wb") as f:
+            f.write(gzip.compress(payload))
+
+        os.replace(tmp_path, entry_path)
+        with self._lock:
+            self._evict()
+
+    def stats(self) -> dict:
+        """Return hit/miss counters and the current cache size."""
+        size = sum(size for _, size, _ in self._entry_stats())
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "size_bytes": size,
+                "max_size_bytes": self.max_size_bytes
+            }
+
+    def _entry_path(self, key: str) -> str:
+        return os.path.join(self.cache_folder, f"{key}.json.gz")
+
+    def _entry_stats(self) -> list[tuple[float, int, os.DirEntry]]:
+        """Modification time and size of each entry on disk."""
+        stats = []
+        for entry in os.scandir(self.cache_folder):
+            if not entry.name.endswith(".json.gz"):
+                continue
+            try:
+                stat = entry.stat()
+            except FileNotFoundError:
+                # Evicted by another process meanwhile
+                continue
+            stats.append((stat.st_mtime, stat.st_size, entry))
+        return stats
+
+    def _evict(self) -> None:
+        """
+        Remove least recently used entries until the cache fits. The
+        size is read from disk, as other processes may have added or
+        evicted entries.
+        """
+        stats = sorted(self._entry_stats(), key=lambda stat: stat[0])
+        size = sum(entry_size for _, entry_size, _ in stats)
+        for _, entry_size, entry in stats:
+            if size <= self.max_size_bytes:
+                break
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                continue
+            size -= entry_size
+            self.evictions += 1
+            logger.info(f"Evicted Textract cache entry: {entry.name}")
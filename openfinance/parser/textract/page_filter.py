@@ -0,0 +1,168 @@
+import logging
+import re
+import threading
+import unicodedata
+
+
+logger = logging.getLogger(__name__)
+
+# Header keywords of the movements table of each bank, without accents
+PAGE_FINGERPRINTS = {
+    "itau": [
+        "fecha",
+        "descripcion",
+        "valor original",
+        "tasa ea",
+        "cuotas",
+        "valor cuota",
+        "saldo pendiente",
+    ],
+    "nu_bank": [
+        "fecha",
+        "descripcion",
+        "valor del mes",
+        "cuotas",
+        "interes",
+        "total a pagar",
+        "restante por pagar",
+    ],
+}
+
+# Dates as they are printed on each row of the movements table
+ROW_DATE_PATTERNS = {
+    "itau": re.compile(r"\b\d{2}/\d{2}/\d{2}\b"),
+    "nu_bank": re.compile(
+        r"\b\d{1,2} (ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)"
+        r"\w* \d{4}\b"),
+}
+
+MIN_KEYWORD_MATCHES = 3
+MIN_DATE_MATCHES = 3
+
+
+def strip_accents(text: str) -> str:
+    """Lowercase a text and remove its accents."""
+    normalized = unicodedata.normalize("NFKD", text.lower())
+    return "".join(c for c in normalized if not unicodedata.combining(c))
+
+
+def normalize_bank_name(bank_name: str) -> str:
+    """Map a bank name such as "Itaú" or "Nu Bank" to its fingerprint key."""
+    name = re.sub(r"[\s\-]+", "_", strip_accents(bank_name).strip())
+    if name in ("nu", "nubank"):
+        return "nu_bank"
+    return name
+
+
+def classify_page(page_text: str, bank_name: str) -> tuple[bool, str]:
+    """
+    Decide from the text layer of a page if it can contain
+    a movements table.
+
+    Pages without a text layer (scanned pages) and banks without
+    a fingerprint are always kept.
+
+    Returns:
+        tuple: (keep, reason)
+    """
+    bank_key = normalize_bank_name(bank_name)
+    if not page_text or not page_text.strip():
+        return True, "no text layer"
+    if bank_key not in PAGE_FINGERPRINTS:
+        return True, f"no fingerprint for bank {bank_name}"
+
+    text = strip_accents(page_text)
+    keyword_matches = sum(
+        keyword in text for keyword in PAGE_FINGERPRINTS[bank_key])
+    date_matches = len(ROW_DATE_PATTERNS[bank_key].findall(text))
+
+    reason = (
+        f"{keyword_matches} header keywords, {date_matches} row dates")
+    keep = (
+        keyword_matches >= MIN_KEYWORD_MATCHES
+        or date_matches >= MIN_DATE_MATCHES)
+    return keep, reason
+
+
+class PageFilter:
+    """
+    Page pre-filter that keeps only the pages that can contain
+    a movements table, using the PDF text layer and per-bank
+    keyword and date fingerprints.
+
+    Instances are callables taking the 1-based page number and the
+    PyPDF2 page, and record the pages they skip.
+    """
+
+    def __init__(self, bank_name: str):
+        """
+        Initialize the PageFilter.
+
+        Args:
+            bank_name (str): Name of the bank
+        """
+        self.bank_name = bank_name
+        self.pages_total = 0
+        self.skipped_pages = []
+        self._lock = threading.Lock()
+
+    def __call__(self, page_number: int, page) -> bool:
+        try:
+            page_text = page.extract_text()
+        except Exception as e:
+            logger.warning(
+                f"Could not extract text of page {page_number}: {e}")
+            page_text = ""
+
+        keep, reason = classify_page(page_text, self.bank_name)
+        with self._lock:
+            self.pages_total += 1
+            if not keep:
+                self.skipped_pages.append(
+                    {"page": page_number, "reason": reason})
+        if not keep:
+            logger.info(f"Skipping page {page_number}: {reason}")
+        return keep
+
+    def report(self) -> dict:
+        """Return the number of pages seen and the pages skipped."""
+        with self._lock:
+            return {
+                "pages_total": self.pages_total,
+                "pages_skipped": len(self.skipped_pages),
+                "skipped": list(self.skipped_pages)
+            }
+
+
+class PageSelection:
+    """
+    Page filter that keeps only the given page numbers, optionally
+    combined with another page filter such as a PageFilter.
+    """
+
+    def __init__(self, pages: list[int], page_filter=None):
+        """
+        Initialize the PageSelection.
+
+        Args:
+            pages (list[int]): 1-based numbers of the pages to keep
+            page_filter (callable, optional): Filter also applied
+                to the selected pages
+        """
+        self.pages = set(pages)
+        self.page_filter = page_filter
+
+    def __call__(self, page_number: int, page) -> bool:
+        if page_number not in self.pages:
+            return False
+        return self.page_filter is None or self.page_filter(page_number, page)
+
+    def report(self) -> dict:
+        """Return the report of the combined filter, if any."""
+        if self.page_filter is not None:
+            return self.page_filter.report()
+        return {
+            "pages_total": len(self.pages),
+            "pages_skipped": 0,
+            "skipped": []
+        }
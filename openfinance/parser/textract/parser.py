@@ -1,7 +1,22 @@
 import openfinance.parser.textract.utils as ut
-from openfinance.parser.textract.textract import analyze_documents_s3
-from openfinance.parser.textract.aws_utils import upload_file_to_s3
+from openfinance.parser.textract.textract import (
+    FEATURE_TYPES,
+    analyze_document_bytes,
+    analyze_document_s3,
+    analyze_document_async_s3,
+    collect_tables,
+    export_tables)
+from openfinance.parser.textract.aws_utils import (
+    get_content_key, s3_object_matches, upload_file_to_s3)
+from openfinance.files.workspace import JobWorkspace
+from openfinance.parser.backend import ExtractionBackend
+from openfinance.parser.textract.cache import TextractCache
+from openfinance.parser.textract.page_filter import PageFilter, PageSelection
+from openfinance.parser.textract.throttling import get_governor
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
 import logging
+import threading
 import openfinance.constants as ct
 import os
 
@@ -9,7 +24,7 @@ import os
 logger = logging.getLogger(__name__)
 
 
-class FinancialStatementTextractParser:
+class FinancialStatementTextractParser(ExtractionBackend):
     """
     A class to parse financial statements using AWS Textract.
     """
@@ -21,7 +36,15 @@ class FinancialStatementTextractParser:
             bank_name: str,
             textract_bucket_name: str = ct.TEXTRACT_BUCKET_NAME,
             temp_folder: str = ct.TEMP_FOLDER,
-            output_folder: str = ct.OUTPUT_FOLDER):
+            output_folder: str = ct.OUTPUT_FOLDER,
+            max_workers: int = 1,
+            engine: str = "sync",
+            cache: TextractCache = None,
+            in_memory: bool = False,
+            prefilter_pages: bool = False,
+            output_format: str = "csv",
+            textract_slots=None,
+            pages: list[int] = None):
         """
         Initialize the FinancialStatementTextract   Parser.
 
@@ -30,59 +53,146 @@ class FinancialStatementTextractParser:
             password (str): Password to decrypt the PDF
             bank_name (str): Name of the bank
             textract_bucket_name (str): Name of the S3 bucket for Textract
-            temp_folder (str): Path to the temporary folder
+            temp_folder (str): Path to the temporary folder. Each parser
+                works in its own job workspace inside this folder.
             output_folder (str): Path to the output folder
+            max_workers (int): Number of pages uploaded and analyzed
+                concurrently. 1 keeps the sequential pipeline.
+            engine (str): "sync" analyzes one-page chunks with
+                AnalyzeDocument; "async" submits the whole decrypted PDF
+                as a single StartDocumentAnalysis job.
+            cache (TextractCache): Optional cache of Textract responses.
+                Cached pages are neither uploaded nor sent to Textract.
+            in_memory (bool): Decrypt and split the PDF in memory and send
+                each page to Textract as raw bytes, skipping the temporary
+                PDF files and the S3 bucket. Only for the "sync" engine.
+            prefilter_pages (bool): Use the PDF text layer to send only
+                the pages that can contain a movements table to Textract.
+            output_format (str): "csv" writes one CSV per table to the
+                job workspace; "dataframe" keeps the tables in memory
+                as DataFrames, returned under the "tables" key. The
+                CSV files are removed with the workspace, by cleanup(),
+                on leaving the context or when the parser is garbage
+                collected, so they must be read or copied before.
+            textract_slots (optional): Semaphore, possibly shared between
+                processes, held during every upload and Textract call to
+                bound their global concurrency.
+            pages (list[int], optional): 1-based numbers of the only
+                pages to analyze, e.g. the scanned pages another
+                backend could not read. The page of each table is
+                returned under "table_pages".
         """
+        if engine not in ("sync", "async"):
+            raise ValueError(f"Unknown Textract engine: {engine}")
+        if output_format not in ("csv", "dataframe"):
+            raise ValueError(f"Unknown output format: {output_format}")
+        if in_memory and engine != "sync":
+            raise ValueError(
+                "The in-memory mode is only available for the sync engine")
+
         self.input_path = input_path
         self.password = password
         self.bank_name = bank_name
         self.textract_bucket_name = textract_bucket_name
-        self.temp_folder = temp_folder
+        self.workspace = JobWorkspace(base_folder=temp_folder)
         self.output_folder = output_folder
+        self.max_workers = max_workers
+        self.engine = engine
+        self.cache = cache
+        self.in_memory = in_memory
+        self.page_filter = PageFilter(bank_name) if prefilter_pages else None
+        if pages is not None:
+            self.page_filter = PageSelection(pages, self.page_filter)
+        self.output_format = output_format
+        self.textract_slots = textract_slots
         self.decrypted_output_path = None
+        self.split_stats = ut.SplitStats()
         self.chunks_paths = []
         self.csv_paths = []
+        self.tables = []
+        self.analyzed_pages = []
+        self.table_pages = []
+        self.cached_tables = {}
+        self.document_keys = {}
+        self.stored_keys = set()
+        self.upload_stats = {
+            "uploaded": 0,
+            "skipped": 0,
+            "failed": 0,
+            "bytes_uploaded": 0
+        }
+        self._upload_lock = threading.Lock()
         self.output_csv_path = None
 
+    @property
+    def temp_folder(self) -> str:
+        """Folder of the job workspace, created on first use."""
+        return self.workspace.path
+
+    def cleanup(self) -> None:
+        """
+        Remove the job workspace. The uploaded chunks are shared by
+        every job through their content address, so they are left in
+        the bucket for its lifecycle rule to expire.
+        """
+        self.workspace.cleanup()
+
     def decrypt_pdf(self) -> str:
         """
-        Decrypt the PDF file.
+        Write a decrypted copy of the whole PDF file.
+        Only the async engine needs it; the sync engine decrypts
+        the pages while splitting them.
 
         Returns:
             str: Path to the decrypted PDF file
         """
         logger.info(f"Decrypting the PDF file: {self.input_path}")
-        logger.info(f"Password: {self.password}")
+        # The async engine analyzes the decrypted PDF as a whole,
+        # so its pages are filtered here instead of when splitting
+        self.analyzed_pages = []
         self.decrypted_output_path = ut.decrypt_pdf_file(
             input_pdf=self.input_path,
-            password=self.password
+            password=self.password,
+            page_filter=self._select_page,
+            output_dir=self.temp_folder
         )
         return self.decrypted_output_path
 
     def split_pdf_into_chunks(self) -> list:
         """
-        Split the decrypted PDF file into pages.
+        Decrypt and split the PDF file into pages in a single pass.
 
         Returns:
             list: List of paths to the PDF chunks
         """
-        logger.info(
-            f"Splitting the PDF file into pages: {self.decrypted_output_path}")
+        logger.info(f"Splitting the PDF file into pages: {self.input_path}")
+        self.analyzed_pages = []
         self.chunks_paths = ut.split_pdf_into_chunks(
-            input_pdf=self.decrypted_output_path
+            input_pdf=self.input_path,
+            chunks_dir=self.temp_folder,
+            page_filter=self._select_page,
+            password=self.password,
+            stats=self.split_stats
         )
         return self.chunks_paths
 
     def upload_chunks_to_s3(self) -> None:
         """
-        Upload PDF chunks to S3 for Textract processing.
+        Upload PDF chunks to S3 for Textract processing. The tables of
+        the cached chunks are exported from their cached Blocks instead,
+        so an entry evicted before analyze_chunks cannot leave a chunk
+        neither uploaded nor cached.
         """
         logger.info("Uploading chunks to S3 ...")
+        self.cached_tables = {}
         for chunk_path in self.chunks_paths:
-            upload_file_to_s3(
-                file_path=chunk_path,
-                bucket_name=self.textract_bucket_name
-            )
+            blocks = self._cached_blocks(chunk_path)
+            if blocks is not None:
+                self.cached_tables[chunk_path] = export_tables(
+                    blocks, chunk_path, self.temp_folder, self.output_format)
+                continue
+            with self._textract_slot():
+                self._upload(chunk_path)
 
     def get_document_keys(self) -> list:
         """
@@ -92,24 +202,260 @@ class FinancialStatementTextractParser:
             list: List of S3 document keys
         """
         return [
-            os.path.basename(chunk_path) for chunk_path in self.chunks_paths]
+            self._document_key(chunk_path)
+            for chunk_path in self.chunks_paths]
 
     def analyze_chunks(self) -> list:
         """
-        Analyze the PDF chunks using AWS Textract.
+        Analyze the PDF chunks using AWS Textract. The chunks whose
+        tables upload_chunks_to_s3 read from the cache are not sent.
 
         Returns:
-            list: List of paths to the generated CSV files
+            list: List of paths to the generated CSV files, or of
+            DataFrames when output_format is "dataframe"
         """
         logger.info("Analyzing chunks ...")
-        document_keys = self.get_document_keys()
-        self.csv_paths = analyze_documents_s3(
-            bucket_name=self.textract_bucket_name,
-            document_keys=document_keys,
-            output_path=self.temp_folder
-        )
-        logger.info(f"CSV paths: {self.csv_paths}")
-        return self.csv_paths
+
+        def analyze(chunk_path: str):
+            if chunk_path in self.cached_tables:
+                return self.cached_tables[chunk_path]
+            return analyze_document_s3(
+                bucket_name=self.textract_bucket_name,
+                document_key=self._document_key(chunk_path),
+                output_path=self.temp_folder,
+                cache=self.cache,
+                document_path=chunk_path,
+                output_format=self.output_format,
+                lookup_cache=False)
+
+        with self._textract_slot():
+            if self.max_workers > 1:
+                with ThreadPoolExecutor(
+                        max_workers=self.max_workers) as executor:
+                    results = list(executor.map(analyze, self.chunks_paths))
+            else:
+                results = [analyze(path) for path in self.chunks_paths]
+        return self._store_tables(results)
+
+    def analyze_chunk(self, chunk_path: str):
+        """
+        Upload a single PDF chunk to S3 and analyze it with Textract.
+
+        Args:
+            chunk_path (str): Path to the PDF chunk
+
+        Returns:
+            list: Paths to the CSV files of the tables of the chunk, or
+            their DataFrames when output_format is "dataframe"
+        """
+        blocks = self._cached_blocks(chunk_path)
+        if blocks is not None:
+            return export_tables(
+                blocks, chunk_path, self.temp_folder, self.output_format)
+        with self._textract_slot():
+            self._upload(chunk_path)
+            return analyze_document_s3(
+                bucket_name=self.textract_bucket_name,
+                document_key=self._document_key(chunk_path),
+                output_path=self.temp_folder,
+                cache=self.cache,
+                document_path=chunk_path,
+                output_format=self.output_format,
+                lookup_cache=False
+            )
+
+    def process_chunks_concurrently(self) -> list:
+        """
+        Split, upload and analyze the PDF chunks with a bounded pool of
+        workers. Each chunk is submitted as soon as it is written to disk
+        and the tables are returned in page order.
+
+        Returns:
+            list: List of paths to the generated CSV files, or of
+            DataFrames when output_format is "dataframe"
+        """
+        logger.info(
+            f"Processing chunks with {self.max_workers} workers: "
+            f"{self.input_path}")
+        self.chunks_paths = []
+        self.analyzed_pages = []
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures = []
+            for chunk_path in ut.iter_pdf_chunks(
+                    input_pdf=self.input_path,
+                    chunks_dir=self.temp_folder,
+                    page_filter=self._select_page,
+                    password=self.password,
+                    stats=self.split_stats):
+                self.chunks_paths.append(chunk_path)
+                futures.append(executor.submit(self.analyze_chunk, chunk_path))
+            results = [future.result() for future in futures]
+
+        return self._store_tables(results)
+
+    def process_chunks_in_memory(self) -> list:
+        """
+        Decrypt and split the PDF in memory and analyze each page
+        by sending its bytes directly to Textract.
+
+        Returns:
+            list: List of paths to the generated CSV files, or of
+            DataFrames when output_format is "dataframe"
+        """
+        logger.info(f"Processing chunks in memory: {self.input_path}")
+        file_name = os.path.basename(self.input_path)
+        self.analyzed_pages = []
+
+        def analyze(chunk: tuple[int, bytes]):
+            index, chunk_bytes = chunk
+            with self._textract_slot():
+                return analyze_document_bytes(
+                    document_bytes=chunk_bytes,
+                    document_key=f"{file_name}_chunk_{index}.pdf",
+                    output_path=self.temp_folder,
+                    cache=self.cache,
+                    output_format=self.output_format
+                )
+
+        with ut.open_pdf(self.input_path, self.password) as reader:
+            chunks = enumerate(
+                ut.iter_pdf_chunk_buffers(
+                    reader, self._select_page, self.split_stats),
+                start=1)
+            if self.max_workers > 1:
+                with ThreadPoolExecutor(
+                        max_workers=self.max_workers) as executor:
+                    futures = [
+                        executor.submit(analyze, chunk) for chunk in chunks]
+                    results = [future.result() for future in futures]
+            else:
+                results = [analyze(chunk) for chunk in chunks]
+
+        return self._store_tables(results)
+
+    def analyze_document_async(self) -> list:
+        """
+        Upload the whole decrypted PDF to S3 and analyze it
+        with a single asynchronous Textract job.
+
+        Returns:
+            list: List of paths to the generated CSV files, or of
+            DataFrames when output_format is "dataframe"
+        """
+        logger.info("Analyzing document with an asynchronous Textract job ...")
+        document_key = self._document_key(self.decrypted_output_path)
+        blocks = self._cached_blocks(
+            self.decrypted_output_path, FEATURE_TYPES + ['ASYNC'])
+        with self._textract_slot():
+            if blocks is None:
+                self._upload(self.decrypted_output_path)
+            results = analyze_document_async_s3(
+                bucket_name=self.textract_bucket_name,
+                document_key=document_key,
+                output_path=self.temp_folder,
+                cache=self.cache,
+                document_path=self.decrypted_output_path,
+                output_format=self.output_format,
+                blocks=blocks,
+                lookup_cache=False,
+                per_page=True
+            )
+        return self._store_tables(results)
+
+    def _textract_slot(self):
+        """Context holding one of the shared Textract slots, if any."""
+        if self.textract_slots is None:
+            return nullcontext()
+        return self.textract_slots
+
+    def _document_key(self, file_path: str) -> str:
+        """Return the content-addressed S3 key of a workspace file."""
+        with self._upload_lock:
+            object_name = self.document_keys.get(file_path)
+        if object_name is None:
+            object_name = get_content_key(file_path)
+            with self._upload_lock:
+                self.document_keys[file_path] = object_name
+        return object_name
+
+    def _upload(self, file_path: str) -> str:
+        """
+        Upload a workspace file to S3 under its content-addressed key,
+        unless an object with the same content is already there.
+
+        Returns:
+            str: S3 object key
+        """
+        object_name = self._document_key(file_path)
+        with self._upload_lock:
+            stored = object_name in self.stored_keys
+        if stored or s3_object_matches(
+                file_path=file_path,
+                bucket_name=self.textract_bucket_name,
+                object_name=object_name):
+            status = "skipped"
+        elif upload_file_to_s3(
+                file_path=file_path,
+                bucket_name=self.textract_bucket_name,
+                object_name=object_name):
+            status = "uploaded"
+        else:
+            status = "failed"
+
+        with self._upload_lock:
+            self.upload_stats[status] += 1
+            if status != "failed":
+                self.stored_keys.add(object_name)
+            if status == "uploaded":
+                self.upload_stats["bytes_uploaded"] += os.path.getsize(
+                    file_path)
+        return object_name
+
+    def _select_page(self, page_number: int, page) -> bool:
+        """
+        Page filter of the PDF split: apply page_filter, if any, and
+        record the number of each page kept, in the order they are
+        analyzed.
+        """
+        if self.page_filter is not None and not self.page_filter(
+                page_number, page):
+            return False
+        self.analyzed_pages.append(page_number)
+        return True
+
+    def _store_tables(self, results: list) -> list:
+        """
+        Keep the tables of the analyzed pages, one result of
+        export_tables per page, according to the output format, with
+        the page number of each table in table_pages.
+        """
+        self.table_pages = [
+            page_number
+            for page_number, tables in zip(self.analyzed_pages, results)
+            for _ in tables]
+        results = collect_tables(results, self.output_format)
+        if self.output_format == "dataframe":
+            self.tables = results
+            logger.info(f"Extracted {len(self.tables)} tables")
+        else:
+            self.csv_paths = results
+            logger.info(f"CSV paths: {self.csv_paths}")
+        return results
+
+    def _cached_blocks(
+            self,
+            document_path: str,
+            feature_types: list[str] = FEATURE_TYPES) -> list[dict] | None:
+        """
+        Read the cached Textract Blocks of a document, or None if they
+        are not cached and the document has to be uploaded. The Blocks
+        are read once and used as they are: checking the cache and
+        reading it later would race with evictions by other jobs.
+        """
+        if self.cache is None:
+            return None
+        return self.cache.get(
+            self.cache.key_for_file(document_path, feature_types))
 
     def parse(self) -> dict:
         """
@@ -119,30 +465,58 @@ class FinancialStatementTextractParser:
             dict: Dictionary containing parsing results and file paths
         """
         try:
-            # Step 1: Decrypt PDF
-            self.decrypt_pdf()
+            if self.in_memory:
+                # Steps 1-4: Decrypt, split and analyze without disk or S3
+                self.process_chunks_in_memory()
+            elif self.engine == "async":
+                # Step 1: Decrypt PDF
+                self.decrypt_pdf()
 
-            # Step 2: Split into chunks
-            self.split_pdf_into_chunks()
+                # Steps 2-4: Analyze the whole PDF in one Textract job
+                self.analyze_document_async()
+            elif self.max_workers > 1:
+                # Steps 1-4: Decrypt, split, upload and analyze pages
+                # concurrently
+                self.process_chunks_concurrently()
+            else:
+                # Steps 1-2: Decrypt and split into chunks
+                self.split_pdf_into_chunks()
 
-            # Step 3: Upload to S3
-            self.upload_chunks_to_s3()
+                # Step 3: Upload to S3
+                self.upload_chunks_to_s3()
 
-            # Step 4: Analyze with Textract
-            self.analyze_chunks()
+                # Step 4: Analyze with Textract
+                self.analyze_chunks()
 
             # Step 5: Preprocess and save final CSV
             # self.preprocess_csv_files()
 
+            page_filter_report = None
+            if self.page_filter is not None:
+                page_filter_report = self.page_filter.report()
+                logger.info(
+                    f"Skipped {page_filter_report['pages_skipped']} of "
+                    f"{page_filter_report['pages_total']} pages")
+
             return {
                 'success': True,
                 'input_path': self.input_path,
                 'decrypted_path': self.decrypted_output_path,
                 'chunks_paths': self.chunks_paths,
-                'csv_paths': self.csv_paths
+                'csv_paths': self.csv_paths,
+                'tables': self.tables,
+                'table_pages': self.table_pages,
+                'cache_stats': self.cache.stats() if self.cache else None,
+                'page_filter_report': page_filter_report,
+                'split_stats': self.split_stats.report(),
+                'upload_stats': dict(self.upload_stats),
+                'throttling_stats': {
+                    name: get_governor(name).stats()
+                    for name in ("textract", "s3")}
             }
 
         except Exception as e:
+            # Throttling and transient AWS errors were already retried
             logger.error(f"Error parsing Financial Statement PDF: {str(e)}")
             return {
                 'success': False,
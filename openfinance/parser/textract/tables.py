@@ -0,0 +1,78 @@
+import pandas as pd
+from openfinance.parser.textract.textract import get_text
+
+
+def index_blocks(blocks: list[dict]) -> tuple[dict, list[dict]]:
+    """
+    Index Textract blocks by Id in a single pass.
+
+    Returns:
+        tuple: (blocks_map, table_blocks)
+    """
+    blocks_map = {}
+    table_blocks = []
+    for block in blocks:
+        blocks_map[block['Id']] = block
+        if block['BlockType'] == "TABLE":
+            table_blocks.append(block)
+    return blocks_map, table_blocks
+
+
+def get_table_grid(table_result: dict, blocks_map: dict) -> list[list]:
+    """
+    Build the row/column grid of a Textract TABLE block.
+    Missing or empty cells are None.
+    """
+    cells = []
+    n_rows = 0
+    n_cols = 0
+    for relationship in table_result.get('Relationships', []):
+        if relationship['Type'] != 'CHILD':
+            continue
+        for child_id in relationship['Ids']:
+            cell = blocks_map[child_id]
+            if cell['BlockType'] != 'CELL':
+                continue
+            cells.append(cell)
+            n_rows = max(n_rows, cell['RowIndex'])
+            n_cols = max(n_cols, cell['ColumnIndex'])
+
+    grid = [[None] * n_cols for _ in range(n_rows)]
+    for cell in cells:
+        text = get_text(cell, blocks_map).strip()
+        grid[cell['RowIndex'] - 1][cell['ColumnIndex'] - 1] = text or None
+    return grid
+
+
+def make_header(header_row: list) -> list[str]:
+    """
+    Turn the first row of a table into column names, naming empty
+    and duplicated cells the same way pd.read_csv does.
+    """
+    columns = []
+    seen = {}
+    for i, name in enumerate(header_row):
+        name = name if name is not None else f"Unnamed: {i}"
+        if name in seen:
+            seen[name] += 1
+            name = f"{name}.{seen[name]}"
+        else:
+            seen[name] = 0
+        columns.append(name)
+    return columns
+
+
+def extract_tables(blocks: list[dict]) -> list[pd.DataFrame]:
+    """
+    Convert the tables found in a list of Textract blocks into
+    DataFrames, using the first row of each table as its header.
+    """
+    blocks_map, table_blocks = index_blocks(blocks)
+    tables = []
+    for table in table_blocks:
+        grid = get_table_grid(table, blocks_map)
+        if not grid:
+            continue
+        tables.append(
+            pd.DataFrame(grid[1:], columns=make_header(grid[0]), dtype=object))
+    return tables
@@ -1,80 +1,362 @@
-import openfinance.constants as ct
+import csv
+import io
 import os
 import logging
-from PyPDF2 import PdfReader
+import time
+from concurrent.futures import ThreadPoolExecutor
+from openfinance.parser.textract.cache import TextractCache
+from openfinance.parser.textract.throttling import get_governor
+from openfinance.clients import get_textract_client
 
 
 logger = logging.getLogger(__name__)
 
+FEATURE_TYPES = ['TABLES', 'FORMS']  # Extract both table and form data
+
 
 def is_pdf_encrypted(file_path: str) -> bool:
     """Check if a PDF file is encrypted."""
+    from PyPDF2 import PdfReader
     with open(file_path, "rb") as f:
         reader = PdfReader(f)
         return reader.is_encrypted
 
 
+def save_tables_csv(
+        blocks: list[dict],
+        document_key: str,
+        output_path: str) -> list[str]:
+    """
+    Write each table found in a list of Textract blocks to its own CSV
+    file, with the first row of the table as its header. The files
+    hold the same tables extract_tables returns as DataFrames, so both
+    output formats give the preprocessors the same input.
+
+    Returns:
+        list[str]: Paths to the CSV files, one per table, empty when
+        the blocks contain no tables
+    """
+    # Imported here: tables depends on this module and on pandas
+    from openfinance.parser.textract.tables import extract_tables
+
+    document_name = os.path.splitext(os.path.basename(document_key))[0]
+    csv_paths = []
+    for index, table in enumerate(extract_tables(blocks), start=1):
+        csv_path = os.path.join(
+            output_path, f"{document_name}_table_{index}.csv")
+        table.to_csv(csv_path, index=False)
+        logger.info(f"Table saved as CSV: {csv_path}")
+        csv_paths.append(csv_path)
+    return csv_paths
+
+
+def export_tables(
+        blocks: list[dict],
+        document_key: str,
+        output_path: str,
+        output_format: str = "csv") -> list:
+    """
+    Export the tables found in a list of Textract blocks, one unit per
+    table in both formats.
+
+    Args:
+        output_format (str): "csv" writes each table to a CSV file in
+            output_path and returns their paths; "dataframe" returns
+            the tables as a list of DataFrames.
+    """
+    if output_format == "dataframe":
+        # Imported here: tables depends on this module and on pandas
+        from openfinance.parser.textract.tables import extract_tables
+        return extract_tables(blocks)
+    return save_tables_csv(blocks, document_key, output_path)
+
+
+def get_document_blocks(
+        document: dict,
+        cache: TextractCache = None,
+        cache_key: str = None,
+        lookup_cache: bool = True) -> list[dict]:
+    """
+    Run a synchronous Textract analysis and return its Blocks,
+    looking them up in the cache first when a cache key is given.
+
+    Args:
+        document (dict): Textract Document, either S3Object or Bytes
+        cache (TextractCache, optional): Cache of Textract responses
+        cache_key (str, optional): Cache key of the document
+        lookup_cache (bool): Read the cache before calling Textract.
+            False when the caller already missed it; the Blocks are
+            still stored.
+    """
+    if cache is not None and cache_key is not None and lookup_cache:
+        blocks = cache.get(cache_key)
+        if blocks is not None:
+            return blocks
+
+    response = get_governor("textract").call(
+        get_textract_client().analyze_document,
+        Document=document,
+        FeatureTypes=FEATURE_TYPES
+    )
+
+    # Get the text blocks
+    blocks = response['Blocks']
+    if cache is not None and cache_key is not None:
+        cache.put(cache_key, blocks)
+    return blocks
+
+
 def analyze_document_s3(
         bucket_name: str,
         document_key: str,
-        output_path: str):
+        output_path: str,
+        cache: TextractCache = None,
+        document_path: str = None,
+        output_format: str = "csv",
+        lookup_cache: bool = True):
     """
     Analyze a document stored in an S3 bucket using
     AWS Textract and save the results locally.
+
+    When a cache and the local copy of the document are given, the
+    Blocks are looked up by content before calling Textract, unless
+    lookup_cache is False because the caller already missed the cache.
+    The CSV files are named after the local copy, if given.
+    """
+    cache_key = None
+    if cache is not None and document_path is not None:
+        cache_key = cache.key_for_file(document_path, FEATURE_TYPES)
+
+    blocks = get_document_blocks(
+        document={
+            'S3Object': {'Bucket': bucket_name, 'Name': document_key}},
+        cache=cache,
+        cache_key=cache_key,
+        lookup_cache=lookup_cache)
+
+    return export_tables(
+        blocks, document_path or document_key, output_path, output_format)
+
+
+def analyze_document_bytes(
+        document_bytes: bytes,
+        document_key: str,
+        output_path: str,
+        cache: TextractCache = None,
+        output_format: str = "csv"):
+    """
+    Analyze a single-page document held in memory using
+    AWS Textract and save the results locally.
+    The document is sent as raw Bytes, so no S3 upload is needed.
+    """
+    cache_key = None
+    if cache is not None:
+        cache_key = cache.make_key(document_bytes, FEATURE_TYPES)
+
+    blocks = get_document_blocks(
+        document={'Bytes': document_bytes},
+        cache=cache,
+        cache_key=cache_key)
+
+    return export_tables(blocks, document_key, output_path, output_format)
+
+
+def start_document_analysis_s3(
+        bucket_name: str,
+        document_key: str,
+        client=None) -> str:
     """
-    response = ct.textract_client.analyze_document(
-        Document={'S3Object': {'Bucket': bucket_name, 'Name': document_key}},
-        FeatureTypes=['TABLES', 'FORMS']  # Extract both table and form data
+    Start an asynchronous, multi-page Textract analysis job
+    for a document stored in an S3 bucket.
+
+    Returns:
+        str: Textract job id
+    """
+    client = client or get_textract_client()
+    response = get_governor("textract").call(
+        client.start_document_analysis,
+        DocumentLocation={
+            'S3Object': {'Bucket': bucket_name, 'Name': document_key}},
+        FeatureTypes=FEATURE_TYPES
     )
+    logger.info(
+        f"Started Textract job {response['JobId']} for {document_key}")
+    return response['JobId']
 
-    # Get the text blocks
-    blocks = response['Blocks']
 
-    blocks_map = {}
-    table_blocks = []
-    for block in blocks:
-        blocks_map[block['Id']] = block
-        if block['BlockType'] == "TABLE":
-            table_blocks.append(block)
+def wait_for_document_analysis(
+        job_id: str,
+        client=None,
+        initial_delay: float = 1.0,
+        max_delay: float = 30.0,
+        timeout: float = 900.0) -> dict:
+    """
+    Poll an asynchronous Textract job with exponential backoff
+    until it finishes.
+
+    Returns:
+        dict: First GetDocumentAnalysis response of the finished job
+
+    Raises:
+        RuntimeError: If the job fails
+        TimeoutError: If the job does not finish within timeout seconds
+    """
+    client = client or get_textract_client()
+    delay = initial_delay
+    deadline = time.monotonic() + timeout
+    while True:
+        response = get_governor("textract").call(
+            client.get_document_analysis, JobId=job_id)
+        status = response['JobStatus']
+        if status in ("SUCCEEDED", "PARTIAL_SUCCESS"):
+            if status == "PARTIAL_SUCCESS":
+                logger.warning(
+                    f"Textract job {job_id} finished with partial success: "
+                    f"{response.get('Warnings')}")
+            return response
+        if status == "FAILED":
+            raise RuntimeError(
+                f"Textract job {job_id} failed: "
+                f"{response.get('StatusMessage')}")
+        if time.monotonic() + delay > deadline:
+            raise TimeoutError(
+                f"Textract job {job_id} did not finish in {timeout} seconds")
+        logger.info(f"Textract job {job_id} is {status}, waiting {delay}s")
+        time.sleep(delay)
+        delay = min(delay * 2, max_delay)
+
+
+def iter_document_analysis_blocks(
+        job_id: str,
+        client=None,
+        first_response: dict = None):
+    """
+    Yield the blocks of a finished Textract job, following NextToken
+    through every page of GetDocumentAnalysis results.
+    """
+    client = client or get_textract_client()
+    response = first_response or get_governor("textract").call(
+        client.get_document_analysis, JobId=job_id)
+    while True:
+        yield from response['Blocks']
+        next_token = response.get('NextToken')
+        if not next_token:
+            break
+        response = get_governor("textract").call(
+            client.get_document_analysis,
+            JobId=job_id,
+            NextToken=next_token)
+
 
-    if len(table_blocks) <= 0:
-        return "<b> NO FOUND </b>"
+def analyze_document_async_s3(
+        bucket_name: str,
+        document_key: str,
+        output_path: str,
+        client=None,
+        cache: TextractCache = None,
+        document_path: str = None,
+        output_format: str = "csv",
+        blocks: list[dict] = None,
+        lookup_cache: bool = True,
+        per_page: bool = False) -> list:
+    """
+    Analyze a multi-page document stored in an S3 bucket with a single
+    asynchronous Textract job and save the tables of each page locally.
+
+    blocks are the Blocks of the document when the caller already read
+    them from the cache; no job is started for them. lookup_cache is
+    False when the caller already missed the cache.
+
+    Returns:
+        list: Paths to the generated CSV files, or the tables as
+        DataFrames when output_format is "dataframe", in page order.
+        With per_page, one list of them per page of the document.
+    """
+    cache_key = None
+    if cache is not None and document_path is not None:
+        cache_key = cache.key_for_file(
+            document_path, FEATURE_TYPES + ['ASYNC'])
+        if blocks is None and lookup_cache:
+            blocks = cache.get(cache_key)
 
-    csv = ''
-    for index, table in enumerate(table_blocks):
-        csv += generate_table_csv(table, blocks_map, index+1)
-        # csv += '\n\n'
+    if blocks is None:
+        job_id = start_document_analysis_s3(
+            bucket_name=bucket_name,
+            document_key=document_key,
+            client=client)
+        first_response = wait_for_document_analysis(job_id, client=client)
+        blocks = iter_document_analysis_blocks(
+            job_id, client=client, first_response=first_response)
+        if cache_key is not None:
+            blocks = list(blocks)
+            cache.put(cache_key, blocks)
 
-    # Save CSV
-    csv_filename = f"{os.path.splitext(document_key)[0]}_table.csv"
-    csv_path = os.path.join(output_path, csv_filename)
+    # Group the streamed blocks by page; relationships never cross pages
+    pages_blocks = {}
+    for block in blocks:
+        pages_blocks.setdefault(block.get('Page', 1), []).append(block)
 
-    with open(csv_path, 'w', newline='', encoding='utf-8') as csvfile:
-        csvfile.write(csv)
-    logger.info(f"Table saved as CSV: {csv_path}")
+    document_name = os.path.splitext(
+        os.path.basename(document_path or document_key))[0]
+    results = [
+        export_tables(
+            blocks=pages_blocks[page],
+            document_key=f"{document_name}_page_{page}.pdf",
+            output_path=output_path,
+            output_format=output_format)
+        for page in sorted(pages_blocks)]
 
-    return csv_path
+    if per_page:
+        return results
+    return collect_tables(results, output_format)
 
 
 def analyze_documents_s3(
         bucket_name: str,
         document_keys: list[str],
-        output_path: str):
+        output_path: str,
+        max_workers: int = 1,
+        cache: TextractCache = None,
+        document_paths: list[str] = None,
+        output_format: str = "csv"):
     """
     Analyze a list of documents stored in an S3 bucket using
     AWS Textract and save the results locally.
+
+    When max_workers is greater than one the documents are analyzed
+    concurrently; the returned CSV paths keep the order of document_keys.
+    document_paths are the local copies of the documents, used as
+    cache keys when a cache is given.
     """
-    csv_paths = []
-    for document_key in document_keys:
-        csv_path = analyze_document_s3(
+    if document_paths is None:
+        document_paths = [None] * len(document_keys)
+
+    def analyze(document: tuple[str, str]) -> str:
+        document_key, document_path = document
+        return analyze_document_s3(
             bucket_name=bucket_name,
             document_key=document_key,
-            output_path=output_path)
-        if csv_path == "<b> NO FOUND </b>":
-            continue
-        csv_paths.append(csv_path)
+            output_path=output_path,
+            cache=cache,
+            document_path=document_path,
+            output_format=output_format)
 
-    return csv_paths
+    documents = list(zip(document_keys, document_paths))
+    if max_workers > 1:
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(analyze, documents))
+    else:
+        results = [analyze(document) for document in documents]
+
+    return collect_tables(results, output_format)
+
+
+def collect_tables(results: list, output_format: str = "csv") -> list:
+    """
+    Merge the per-document results of export_tables, in order: the
+    CSV paths or DataFrames of every table of every document.
+    """
+    return [table for tables in results for table in tables]
 
 
 def save_to_file(
@@ -131,21 +413,14 @@ def generate_table_csv(table_result, blocks_map, table_index):
 
     #  table_id = 'Table_' + str(table_index)
 
-    # get cells.
-    csv = ''  # Table: {0}\n\n'.format(table_id)
+    # get cells. The csv module quotes commas, quotes and newlines
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator='\n')
 
     for row_index, cols in rows.items():
-        row_values = []
-        for col_index, text in cols.items():
-            _ = len(cols.items())
-            # Clean up the text by stripping whitespace
-            cleaned_text = text.strip() if text else ""
-            # Quote the text if it contains
-            # commas to prevent CSV parsing issues
-            if ',' in cleaned_text:
-                cleaned_text = f'"{cleaned_text}"'
-            row_values.append(cleaned_text)
-        csv += ','.join(row_values) + '\n'
+        # Clean up the text by stripping whitespace
+        writer.writerow(
+            [text.strip() if text else "" for text in cols.values()])
 
     # Save confidence scores
     # csv += '\n\nConfidence Scores % (Table Cell) \n'
@@ -158,4 +433,4 @@ def generate_table_csv(table_result, blocks_map, table_index):
     #        cols_count = 0
 
     #  csv += '\n\n\n'
-    return csv
+    return buffer.getvalue()
@@ -0,0 +1,242 @@
+import logging
+import random
+import threading
+import time
+import openfinance.constants as ct
+
+
+logger = logging.getLogger(__name__)
+
+THROTTLING_ERROR_CODES = {
+    "ThrottlingException",
+    "Throttling",
+    "ProvisionedThroughputExceededException",
+    "LimitExceededException",
+    "RequestLimitExceeded",
+    "TooManyRequestsException",
+    "SlowDown",
+}
+
+TRANSIENT_ERROR_CODES = {
+    "InternalServerError",
+    "InternalError",
+    "ServiceUnavailable",
+    "ServiceUnavailableException",
+    "RequestTimeout",
+    "RequestTimeoutException",
+}
+
+
+def _client_error(error: Exception) -> Exception:
+    """
+    Return the client error behind a failed managed S3 transfer, which
+    boto3 wraps in an S3UploadFailedError, or the error itself.
+    """
+    from boto3.exceptions import S3UploadFailedError
+    if isinstance(error, S3UploadFailedError) and error.__context__:
+        return error.__context__
+    return error
+
+
+def is_throttling_error(error: Exception) -> bool:
+    """Check if an AWS error is a throttling error."""
+    from botocore.exceptions import ClientError
+    error = _client_error(error)
+    return (
+        isinstance(error, ClientError)
+        and error.response.get("Error", {}).get("Code")
+        in THROTTLING_ERROR_CODES)
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Check if an AWS error is a throttling or transient error."""
+    from botocore.exceptions import (
+        ClientError,
+        ConnectionClosedError,
+        ConnectTimeoutError,
+        EndpointConnectionError,
+        ReadTimeoutError
+    )
+    error = _client_error(error)
+    if isinstance(error, (
+            ConnectionClosedError,
+            ConnectTimeoutError,
+            EndpointConnectionError,
+            ReadTimeoutError)):
+        return True
+    if isinstance(error, ClientError):
+        code = error.response.get("Error", {}).get("Code")
+        status = error.response.get(
+            "ResponseMetadata", {}).get("HTTPStatusCode", 0)
+        return (
+            code in THROTTLING_ERROR_CODES
+            or code in TRANSIENT_ERROR_CODES
+            or status >= 500)
+    return False
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at rate tokens per second,
+    holding at most capacity tokens.
+    """
+
+    def __init__(self, rate: float, capacity: float = None):
+        """
+        Initialize the TokenBucket.
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (float, optional): Maximum tokens, defaults to rate
+        """
+        self.rate = rate
+        self.capacity = capacity or rate
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._waiting = 0
+        self._lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, blocking until one is available.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        start = time.monotonic()
+        with self._lock:
+            self._waiting += 1
+        try:
+            while True:
+                with self._lock:
+                    self._refill()
+                    if self._tokens >= 1:
+                        self._tokens -= 1
+                        return time.monotonic() - start
+                    wait = (1 - self._tokens) / self.rate
+                time.sleep(wait)
+        finally:
+            with self._lock:
+                self._waiting -= 1
+
+    @property
+    def available(self) -> float:
+        """Tokens currently available."""
+        with self._lock:
+            self._refill()
+            return self._tokens
+
+    @property
+    def waiting(self) -> int:
+        """Number of callers waiting for a token."""
+        with self._lock:
+            return self._waiting
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity,
+            self._tokens + (now - self._updated_at) * self.rate)
+        self._updated_at = now
+
+
+class ThroughputGovernor:
+    """
+    Client-side throughput governor for AWS calls: a token bucket sized
+    to the account quota plus jittered exponential backoff on throttling
+    and transient errors.
+    """
+
+    def __init__(
+            self,
+            name: str,
+            rate: float,
+            burst: float = None,
+            max_retries: int = ct.AWS_MAX_RETRIES,
+            base_delay: float = 0.5,
+            max_delay: float = 20.0):
+        """
+        Initialize the ThroughputGovernor.
+
+        Args:
+            name (str): Name used in logs and stats
+            rate (float): Calls per second allowed (TPS quota)
+            burst (float, optional): Bucket capacity, defaults to rate
+            max_retries (int): Retries before the error is raised
+            base_delay (float): First backoff delay in seconds
+            max_delay (float): Maximum backoff delay in seconds
+        """
+        self.name = name
+        self.bucket = TokenBucket(rate, burst)
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.calls = 0
+        self.retries = 0
+        self.throttles = 0
+        self.failures = 0
+        self._lock = threading.Lock()
+
+    def call(self, fn, *args, **kwargs):
+        """
+        Call fn once a token is available, retrying throttling and
+        transient errors with full-jitter exponential backoff.
+        """
+        attempt = 0
+        while True:
+            self.bucket.acquire()
+            with self._lock:
+                self.calls += 1
+            try:
+                return fn(*args, **kwargs)
+            except Exception as e:
+                if not is_retryable_error(e) or attempt >= self.max_retries:
+                    with self._lock:
+                        self.failures += 1
+                    raise
+                delay = random.uniform(
+                    0, min(self.max_delay, self.base_delay * 2 ** attempt))
+                with self._lock:
+                    self.retries += 1
+                    if is_throttling_error(e):
+                        self.throttles += 1
+                attempt += 1
+                logger.warning(
+                    f"{self.name} call failed ({e}), retry {attempt}/"
+                    f"{self.max_retries} in {delay:.2f}s")
+                time.sleep(delay)
+
+    def stats(self) -> dict:
+        """Return current permits, queue depth and retry counters."""
+        with self._lock:
+            return {
+                "name": self.name,
+                "rate": self.bucket.rate,
+                "permits": round(self.bucket.available, 3),
+                "queue_depth": self.bucket.waiting,
+                "calls": self.calls,
+                "retries": self.retries,
+                "throttles": self.throttles,
+                "failures": self.failures
+            }
+
+
+_governors = {}
+_governors_lock = threading.Lock()
+
+GOVERNOR_RATES = {
+    "textract": ct.TEXTRACT_MAX_TPS,
+    "s3": ct.S3_MAX_TPS,
+}
+
+
+def get_governor(name: str) -> ThroughputGovernor:
+    """
+    Return the process-wide governor of a service ("textract" or "s3"),
+    shared by every worker thread.
+    """
+    with _governors_lock:
+        if name not in _governors:
+            _governors[name] = ThroughputGovernor(
+                name=name, rate=GOVERNOR_RATES[name])
+        return _governors[name]
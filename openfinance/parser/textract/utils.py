@@ -1,27 +1,107 @@
-from PyPDF2 import PdfReader, PdfWriter
+from __future__ import annotations
+from contextlib import contextmanager
+from typing import TYPE_CHECKING
+import io
+import mmap
 import os
 import logging
+import time
+import tracemalloc
 import openfinance.constants as ct
 
+# PyPDF2 is imported inside the functions that use it
+if TYPE_CHECKING:
+    from PyPDF2 import PdfReader
+
 logger = logging.getLogger(__name__)
 
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+class SplitStats:
+    """
+    Time per page and peak memory of a PDF split.
+    The peak traced memory is only reported while tracemalloc is on.
+    """
+
+    def __init__(self):
+        """Initialize the SplitStats."""
+        self.page_seconds = []
+        self.chunks = 0
+
+    def add_chunk(self, pages: int, seconds: float) -> None:
+        """Record the time spent writing a chunk of pages."""
+        self.chunks += 1
+        self.page_seconds.extend([seconds / pages] * pages)
+
+    def report(self) -> dict:
+        """Return the pages, chunks, time per page and peak memory."""
+        pages = len(self.page_seconds)
+        total = sum(self.page_seconds)
+        report = {
+            "pages": pages,
+            "chunks": self.chunks,
+            "seconds": round(total, 4),
+            "seconds_per_page": round(total / pages, 4) if pages else None,
+            "max_page_seconds": (
+                round(max(self.page_seconds), 4) if pages else None),
+            "peak_rss_mb": None,
+            "peak_traced_mb": None
+        }
+        if resource is not None:
+            # ru_maxrss is in kilobytes on Linux
+            report["peak_rss_mb"] = round(
+                resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024, 1)
+        if tracemalloc.is_tracing():
+            report["peak_traced_mb"] = round(
+                tracemalloc.get_traced_memory()[1] / 1024 ** 2, 1)
+        return report
+
 
 def read_pdf(pdf_path: str) -> PdfReader:
     """
     Read a PDF file.
     """
+    from PyPDF2 import PdfReader
     return PdfReader(pdf_path)
 
 
+def iter_page_groups(
+        reader: PdfReader,
+        page_filter=None,
+        group_size: int = ct.MAX_PDF_CHUNK_SIZE):
+    """
+    Yield lists of up to group_size page indices of a PDF.
+    When page_filter is given, only the pages for which
+    page_filter(page_number, page) is true are included.
+    """
+    group = []
+    for i, page in enumerate(reader.pages):
+        if page_filter is not None and not page_filter(i + 1, page):
+            continue
+        group.append(i)
+        if len(group) == group_size:
+            yield group
+            group = []
+    if group:
+        yield group
+
+
 def write_pdf(
         pdf_path: str,
-        reader: PdfReader):
+        reader: PdfReader,
+        page_filter=None):
     """
     Write a PDF file.
     """
+    from PyPDF2 import PdfWriter
     writer = PdfWriter()
-    for page in reader.pages:
-        writer.add_page(page)
+    for group in iter_page_groups(reader, page_filter):
+        for i in group:
+            writer.add_page(reader.pages[i])
 
     with open(pdf_path, "wb") as output_file:
         writer.write(output_file)
@@ -38,9 +118,27 @@ def decrypt_pdf(
     return reader
 
 
+@contextmanager
+def open_pdf(input_pdf: str, password: str = None):
+    """
+    Open a PDF file memory-mapped, without reading it into memory.
+    Encrypted PDFs are decrypted lazily: each object is decrypted
+    when a page that uses it is read.
+
+    Yields:
+        PdfReader: Reader of the PDF, valid inside the context
+    """
+    from PyPDF2 import PdfReader
+    with open(input_pdf, "rb") as f:
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            yield decrypt_pdf(PdfReader(mapped), password)
+
+
 def decrypt_pdf_file(
         input_pdf: str,
-        password: str):
+        password: str,
+        page_filter=None,
+        output_dir: str = ct.TEMP_FOLDER):
     """
     Remove the password from a PDF file.
 
@@ -48,53 +146,93 @@ def decrypt_pdf_file(
         input_pdf (str): The path to the input PDF file.
         output_pdf (str): The path to the output PDF file.
         password (str): The password to remove from the PDF file.
-    """    # Read the PDF file
-    reader = read_pdf(input_pdf)
-
-    # Decrypt the PDF file
-    reader = decrypt_pdf(reader, password)
-
-    # Write the PDF file
+        page_filter (callable, optional): Keep only the pages for which
+            page_filter(page_number, page) is true.
+        output_dir (str): Folder where the decrypted PDF is written.
+    """
     output_pdf = (
-        f"{ct.TEMP_FOLDER}/{os.path.basename(input_pdf)}_decrypted.pdf"
+        f"{output_dir}/{os.path.basename(input_pdf)}_decrypted.pdf"
     )
-    write_pdf(output_pdf, reader)
+    # Read, decrypt and write the PDF file
+    with open_pdf(input_pdf, password) as reader:
+        write_pdf(output_pdf, reader, page_filter)
 
     return output_pdf
 
 
-def split_pdf_into_chunks(
+def iter_pdf_chunks(
         input_pdf: str,
-        chunks_dir: str = ct.TEMP_FOLDER):
-    """
-    Split a PDF file into chunks.
+        chunks_dir: str = ct.TEMP_FOLDER,
+        page_filter=None,
+        password: str = None,
+        stats: SplitStats = None):
     """
+    Split a PDF file into chunks, yielding the path of each chunk
+    as soon as it is written so callers can start working on it.
+    Pages rejected by page_filter are not written.
 
+    An encrypted PDF is decrypted while it is split, in a single
+    pass over the memory-mapped source, so no decrypted copy of
+    the whole file is written.
+
+    Args:
+        input_pdf (str): Path to the PDF file
+        chunks_dir (str): Folder where the chunks are written
+        page_filter (callable, optional): Keep only the pages for which
+            page_filter(page_number, page) is true.
+        password (str, optional): Password of an encrypted PDF
+        stats (SplitStats, optional): Records the time per page
+    """
     if not os.path.exists(chunks_dir):
         os.mkdir(chunks_dir)
 
-    reader = read_pdf(input_pdf)
-    total_pages = len(reader.pages)
-    chunks_paths = []
-
     # Get file name wihtout entire path
     file_name = os.path.basename(input_pdf)
 
-    for i in range(0, total_pages, ct.MAX_PDF_CHUNK_SIZE):
-        writer = PdfWriter()
-        for j in range(i, min(i + ct.MAX_PDF_CHUNK_SIZE, total_pages)):
-            writer.add_page(reader.pages[j])
+    with open_pdf(input_pdf, password) as reader:
+        for index, chunk_bytes in enumerate(
+                iter_pdf_chunk_buffers(reader, page_filter, stats), start=1):
+            output_pdf = f"{chunks_dir}/{file_name}_chunk_{index}.pdf"
+            with open(output_pdf, "wb") as output_file:
+                output_file.write(chunk_bytes)
+
+            yield output_pdf
+
+
+def split_pdf_into_chunks(
+        input_pdf: str,
+        chunks_dir: str = ct.TEMP_FOLDER,
+        page_filter=None,
+        password: str = None,
+        stats: SplitStats = None):
+    """
+    Split a PDF file into chunks.
+    """
+    return list(iter_pdf_chunks(
+        input_pdf, chunks_dir, page_filter, password, stats))
 
-        output_pdf = (
-            f"{chunks_dir}/{file_name}_chunk_"
-            f"{i//ct.MAX_PDF_CHUNK_SIZE + 1}.pdf"
-        )
-        with open(output_pdf, "wb") as output_file:
-            writer.write(output_file)
 
-        chunks_paths.append(output_pdf)
+def iter_pdf_chunk_buffers(
+        reader: PdfReader,
+        page_filter=None,
+        stats: SplitStats = None):
+    """
+    Split an open PDF into chunks held in memory,
+    yielding the bytes of each chunk.
+    Pages rejected by page_filter are not included.
+    """
+    from PyPDF2 import PdfWriter
+    for group in iter_page_groups(reader, page_filter):
+        start = time.perf_counter()
+        writer = PdfWriter()
+        for j in group:
+            writer.add_page(reader.pages[j])
 
-    return chunks_paths
+        buffer = io.BytesIO()
+        writer.write(buffer)
+        if stats is not None:
+            stats.add_chunk(len(group), time.perf_counter() - start)
+        yield buffer.getvalue()
 
 
 def get_file_format(file_path: str) -> str:
@@ -0,0 +1,290 @@
+import logging
+import os
+import re
+import time
+import openfinance.constants as ct
+import openfinance.parser.processors as processors
+from openfinance.files.statement_index import StatementIndex
+from openfinance.files.utils import hash_file
+from openfinance.parser.backend import get_backend
+from openfinance.parser.textract.cache import TextractCache
+from openfinance.parser.textract.page_filter import strip_accents
+from openfinance.parser.textract.utils import open_pdf
+from openfinance.storage.dataset import StatementDataset
+
+logger = logging.getLogger(__name__)
+
+# Supported banks: name given to the parser, constant holding the PDF
+# password, preprocessor of the extracted tables, product of the
+# statements and the patterns that identify them by file name and by
+# first-page text
+BANKS = {
+    "itau": {
+        "bank_name": "Itau",
+        "password": "ITAU_PASSWORD",
+        "preprocessor": "CreditCardItauStatementPreprocessor",
+        "product": "credit_card",
+        "file_pattern": re.compile(r"itau"),
+        "text_pattern": re.compile(r"itau"),
+    },
+    "nu_bank": {
+        "bank_name": "Nu",
+        "password": "NU_BANK_PASSWORD",
+        "preprocessor": "CreditCardNuBankStatementPreprocessor",
+        "product": "credit_card",
+        "file_pattern": re.compile(r"^nu[_\-\s]|nu[_\-\s]?bank"),
+        "text_pattern": re.compile(r"nu financiera|nu[_\s]?bank|nu colombia"),
+    },
+}
+
+
+MONTHS = {
+    "ene": 1, "feb": 2, "mar": 3, "abr": 4, "may": 5, "jun": 6,
+    "jul": 7, "ago": 8, "sep": 9, "oct": 10, "nov": 11, "dic": 12,
+}
+
+# Statement periods written in file names, e.g. Nu_2025-06-12.pdf
+# or extracto_junio_2025.pdf
+FILE_PERIOD_PATTERNS = [
+    re.compile(
+        r"(?<!\d)(20\d{2})[-_. ]?(0[1-9]|1[0-2])(?:[-_. ]?\d{2})?(?!\d)"),
+    re.compile(r"(ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|dic)[a-z]*"
+               r"[-_. ]?(20\d{2})"),
+]
+
+# Dates printed on the first page: DD/MM/YY(YY) and "17 may 2025"
+TEXT_DATE_PATTERNS = [
+    re.compile(r"\b(\d{1,2})/(\d{1,2})/(\d{2}|\d{4})\b"),
+    re.compile(r"\b(\d{1,2}) (ene|feb|mar|abr|may|jun|jul|ago|sep|oct|nov|"
+               r"dic)[a-z]* (?:de )?(\d{4})\b"),
+]
+
+
+def read_first_page_text(input_path: str, password: str = None) -> str:
+    """
+    Return the text of the first page of a PDF, lowercase and without
+    accents, or an empty string if it cannot be read.
+    """
+    try:
+        with open_pdf(input_path, password) as reader:
+            return strip_accents(reader.pages[0].extract_text() or "")
+    except Exception as e:
+        logger.warning(f"Could not read the first page of {input_path}: {e}")
+        return ""
+
+
+def detect_period(input_path: str, bank: str) -> str | None:
+    """
+    Detect the period of a statement as "YYYY-MM", from its file name
+    or, failing that, from the latest date printed on its first page.
+
+    Returns:
+        str | None: Period of the statement, or None if unknown
+    """
+    file_name = strip_accents(os.path.basename(input_path))
+    year_month, month_year = FILE_PERIOD_PATTERNS
+    match = year_month.search(file_name)
+    if match:
+        return f"{match.group(1)}-{match.group(2)}"
+    match = month_year.search(file_name)
+    if match:
+        return f"{match.group(2)}-{MONTHS[match.group(1)]:02d}"
+
+    password = getattr(ct, BANKS[bank]["password"]) if bank in BANKS else None
+    text = read_first_page_text(input_path, password)
+    numeric, written = TEXT_DATE_PATTERNS
+    periods = []
+    for day, month, year in numeric.findall(text):
+        if 1 <= int(month) <= 12:
+            year = int(year) + 2000 if len(year) == 2 else int(year)
+            periods.append(f"{year}-{int(month):02d}")
+    for day, month, year in written.findall(text):
+        periods.append(f"{year}-{MONTHS[month]:02d}")
+    return max(periods) if periods else None
+
+
+def detect_bank(input_path: str) -> str | None:
+    """
+    Detect the bank of a statement from its file name or,
+    failing that, from the text of its first page.
+
+    Returns:
+        str | None: Key of the bank in BANKS, or None if unknown
+    """
+    file_name = strip_accents(os.path.basename(input_path))
+    for bank, config in BANKS.items():
+        if config["file_pattern"].search(file_name):
+            return bank
+
+    # Fall back to the first page; the password that opens the PDF
+    # is also a strong hint of the bank
+    from PyPDF2 import PdfReader
+    try:
+        reader = PdfReader(input_path)
+        for bank, config in BANKS.items():
+            if reader.is_encrypted:
+                password = getattr(ct, config["password"])
+                if not password or not reader.decrypt(password):
+                    continue
+            text = strip_accents(reader.pages[0].extract_text() or "")
+            if config["text_pattern"].search(text):
+                return bank
+    except Exception as e:
+        logger.warning(
+            f"Could not read {input_path} to detect its bank: {e}")
+    return None
+
+
+def process_statement(
+        input_path: str,
+        bank: str = None,
+        output_folder: str = ct.OUTPUT_FOLDER,
+        max_workers: int = 1,
+        textract_slots=None,
+        use_cache: bool = False,
+        backend: str = "textract",
+        use_index: bool = False,
+        force: bool = False,
+        low_memory: bool = False,
+        output_format: str = "csv",
+        prefilter_pages: bool = False) -> dict:
+    """
+    Run the decrypt -> extract -> preprocess pipeline on one statement.
+
+    With use_index, statements whose content, bank and period were
+    already processed are not processed again: the previous summary is
+    returned, marked as deduplicated. The defaults analyze one page at
+    a time without the cache or the index, as a single statement always
+    was; openfinance.batch turns them on.
+
+    Args:
+        input_path (str): Path to the encrypted PDF statement
+        bank (str, optional): Key of the bank in BANKS; detected if None
+        output_folder (str): Folder where the processed CSV is saved
+        max_workers (int): Pages analyzed concurrently by the parser.
+            1 analyzes them one at a time.
+        textract_slots (optional): Semaphore shared by every statement
+            that bounds the concurrent Textract calls
+        use_cache (bool): Use the on-disk cache of Textract responses
+        backend (str): Extraction backend, "textract" or "text_layer".
+            The text layer backend still uses Textract for scanned pages.
+        use_index (bool): Check and record the statement in the local
+            index of processed statements
+        force (bool): Process the statement even if it is in the index
+        low_memory (bool): Preprocess the tables in place and keep only
+            the compacted result, see FinancialStatementPreprocessor
+        output_format (str): "csv" writes <output_folder>/<file>.csv;
+            "dataset" writes the statement to the Parquet dataset in
+            <output_folder>/dataset, partitioned by bank, product and
+            statement month
+        prefilter_pages (bool): Skip the pages whose text layer shows
+            no movements table before sending them to Textract. Off by
+            default: a page the bank fingerprint misses is not read.
+
+    Returns:
+        dict: Status, timings and output of the statement
+    """
+    if output_format not in ("csv", "dataset"):
+        raise ValueError(f"Unknown output format: {output_format}")
+
+    start = time.perf_counter()
+    summary = {
+        "input_path": input_path,
+        "bank": bank,
+        "period": None,
+        "backend": backend,
+        "status": "error",
+        "deduplicated": False,
+        "error": None,
+        "rows": None,
+        "output_path": None,
+        "parse_seconds": None,
+        "preprocess_seconds": None,
+        "seconds": None,
+    }
+    index = None
+
+    try:
+        bank = bank or detect_bank(input_path)
+        summary["bank"] = bank
+        if bank not in BANKS:
+            raise ValueError(f"Unknown bank for statement: {input_path}")
+        config = BANKS[bank]
+
+        if use_index:
+            index = StatementIndex()
+            file_hash = hash_file(input_path)
+            period = detect_period(input_path, bank)
+            summary["period"] = period
+            fingerprint = index.make_fingerprint(file_hash, bank, period)
+            previous = index.get(fingerprint)
+            if (previous is not None and not force
+                    and os.path.exists(previous["output_path"])):
+                logger.info(
+                    f"Skipping {input_path}: already processed as "
+                    f"{previous['input_path']}")
+                previous.update(
+                    input_path=input_path,
+                    deduplicated=True,
+                    seconds=round(time.perf_counter() - start, 3))
+                return previous
+            if previous is None and period is not None:
+                processed = index.find_period(bank, period)
+                if processed:
+                    logger.warning(
+                        f"{input_path} differs from the {bank} statements "
+                        f"already processed for {period}: {processed}")
+
+        with get_backend(backend)(
+            input_path=input_path,
+            password=getattr(ct, config["password"]),
+            bank_name=config["bank_name"],
+            output_folder=output_folder,
+            max_workers=max_workers,
+            cache=TextractCache() if use_cache else None,
+            prefilter_pages=prefilter_pages,
+            output_format="dataframe",
+            textract_slots=textract_slots
+        ) as parser:
+            parser_results = parser.parse()
+        summary["parse_seconds"] = round(time.perf_counter() - start, 3)
+        if not parser_results["success"]:
+            raise RuntimeError(parser_results["error"])
+        # Only the preprocessor keeps a reference to the tables
+        del parser
+        tables = parser_results.pop("tables")
+
+        preprocess_start = time.perf_counter()
+        preprocessor_class = getattr(processors, config["preprocessor"])
+        preprocessor = preprocessor_class(
+            input_path=input_path,
+            csv_files=None,
+            output_folder=output_folder,
+            tables=tables,
+            low_memory=low_memory
+        )
+        del tables
+        if output_format == "dataset":
+            summary["output_path"] = (
+                preprocessor.process_financial_statement_to_dataset(
+                    dataset=StatementDataset(
+                        os.path.join(output_folder, "dataset")),
+                    product=config["product"],
+                    month=(summary["period"]
+                           or detect_period(input_path, bank))))
+        else:
+            summary["output_path"] = (
+                preprocessor.process_financial_statement())
+        summary["rows"] = len(preprocessor.processed_df)
+        summary["preprocess_seconds"] = round(
+            time.perf_counter() - preprocess_start, 3)
+        summary["status"] = "ok"
+
+    except Exception as e:
+        logger.error(f"Error processing {input_path}: {e}")
+        summary["error"] = str(e)
+
+    summary["seconds"] = round(time.perf_counter() - start, 3)
+    if index is not None and summary["status"] == "ok":
+        index.put(fingerprint, file_hash, bank, period, summary)
+    return summary
@@ -0,0 +1,227 @@
+from __future__ import annotations
+
+import logging
+import os
+import re
+import uuid
+from datetime import date
+from typing import TYPE_CHECKING
+import openfinance.constants as ct
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Partition keys of the dataset, in directory order
+PARTITION_KEYS = ["bank", "product", "month"]
+# Characters allowed in partition values and file names
+UNSAFE_CHARACTERS = re.compile(r"[^A-Za-z0-9_.-]+")
+
+
+def _require_pyarrow():
+    try:
+        import pyarrow  # noqa: F401
+    except ImportError as e:
+        raise ImportError(
+            "The statement dataset needs pyarrow: pip install pyarrow"
+        ) from e
+
+
+def _combine(conditions: list):
+    """Join dataset filter expressions with "and", or None if empty."""
+    expression = None
+    for condition in conditions:
+        expression = (condition if expression is None
+                      else expression & condition)
+    return expression
+
+
+def _safe_name(value: str) -> str:
+    return UNSAFE_CHARACTERS.sub("_", str(value)).strip("_") or "unknown"
+
+
+class StatementDataset:
+    """
+    Local Parquet dataset of processed movements, partitioned by bank,
+    product and statement month, e.g.
+    ``bank=itau/product=credit_card/month=2025-06/part-<name>.parquet``.
+
+    Each statement is one file, written to a hidden temporary file and
+    renamed into place, so readers never see partial files and writing
+    a statement again replaces it. Reads only open the partitions and
+    columns they need.
+
+    Requires pyarrow.
+    """
+
+    def __init__(self, root: str = ct.DATASET_FOLDER):
+        """
+        Initialize the StatementDataset.
+
+        Args:
+            root (str): Folder of the dataset
+        """
+        self.root = root
+
+    def partition_path(self, bank: str, product: str, month: str) -> str:
+        """Return the folder of a partition."""
+        return os.path.join(
+            self.root,
+            f"bank={_safe_name(bank)}",
+            f"product={_safe_name(product)}",
+            f"month={_safe_name(month)}")
+
+    def write(
+            self,
+            df: pd.DataFrame,
+            bank: str,
+            product: str,
+            name: str,
+            month: str = None) -> str:
+        """
+        Write the movements of one statement to its partition.
+
+        Args:
+            df (pd.DataFrame): Processed movements of the statement
+            bank (str): Bank of the statement
+            product (str): Product of the statement, e.g. "credit_card"
+            name (str): Name of the statement in its partition; a
+                statement written again under the same name replaces
+                the previous one
+            month (str, optional): Statement month as "YYYY-MM". If
+                None, the month of the latest txn_date is used.
+
+        Returns:
+            str: Path to the Parquet file
+        """
+        _require_pyarrow()
+        import pyarrow.parquet as pq
+
+        if month is None:
+            latest = (df["txn_date"].max()
+                      if "txn_date" in df.columns and len(df) else None)
+            month = (latest.strftime("%Y-%m")
+                     if latest is not None and latest == latest
+                     else "unknown")
+
+        folder = self.partition_path(bank, product, month)
+        os.makedirs(folder, exist_ok=True)
+        path = os.path.join(folder, f"part-{_safe_name(name)}.parquet")
+        # Files starting with a dot are ignored by the readers
+        temp_path = os.path.join(
+            folder, f".part-{uuid.uuid4().hex}.parquet.tmp")
+        try:
+            pq.write_table(self._to_table(df), temp_path)
+            os.replace(temp_path, path)
+        finally:
+            if os.path.exists(temp_path):
+                os.remove(temp_path)
+        logger.info(f"Wrote {len(df)} movements to {path}")
+        return path
+
+    def read(
+            self,
+            columns: list[str] = None,
+            banks: list[str] = None,
+            products: list[str] = None,
+            months: tuple[str, str] = None,
+            start: date | str = None,
+            end: date | str = None) -> pd.DataFrame:
+        """
+        Read movements from the dataset. Filters on the partition keys
+        skip the partitions that do not match without opening them, and
+        the txn_date filters are pushed down to the Parquet row groups.
+
+        Args:
+            columns (list[str], optional): Columns to read. The partition
+                keys bank, product and month can be requested too.
+            banks (list[str], optional): Banks to read
+            products (list[str], optional): Products to read
+            months (tuple, optional): First and last statement month to
+                read, as "YYYY-MM"
+            start (date | str, optional): First transaction date
+            end (date | str, optional): Last transaction date
+
+        Returns:
+            pd.DataFrame: Matching movements
+        """
+        _require_pyarrow()
+        import pandas as pd
+        import pyarrow as pa
+        import pyarrow.dataset as ds
+
+        if not os.path.isdir(self.root):
+            return pd.DataFrame(columns=columns)
+
+        partitioning = ds.partitioning(
+            pa.schema([(key, pa.string()) for key in PARTITION_KEYS]),
+            flavor="hive")
+
+        partition_filters = []
+        if banks is not None:
+            partition_filters.append(ds.field("bank").isin(
+                [_safe_name(bank) for bank in banks]))
+        if products is not None:
+            partition_filters.append(ds.field("product").isin(
+                [_safe_name(product) for product in products]))
+        if months is not None:
+            partition_filters.append(ds.field("month") >= months[0])
+            partition_filters.append(ds.field("month") <= months[1])
+        row_filters = []
+        if start is not None:
+            start = pd.Timestamp(start)
+            row_filters.append(ds.field("txn_date") >= start)
+            # A statement only holds movements up to its own month
+            partition_filters.append(
+                ds.field("month") >= start.strftime("%Y-%m"))
+        if end is not None:
+            row_filters.append(ds.field("txn_date") <= pd.Timestamp(end))
+
+        # Only the files of the matching partitions are opened, to
+        # merge their columns: banks do not share all of them
+        fragments = list(
+            ds.dataset(self.root, format="parquet",
+                       partitioning=partitioning)
+            .get_fragments(filter=_combine(partition_filters)))
+        if not fragments:
+            return pd.DataFrame(columns=columns)
+        schema = pa.unify_schemas(
+            [fragment.physical_schema for fragment in fragments]
+            + [partitioning.schema])
+        dataset = ds.dataset(
+            [fragment.path for fragment in fragments],
+            schema=schema,
+            format="parquet",
+            partitioning=partitioning,
+            partition_base_dir=self.root)
+        table = dataset.to_table(
+            columns=columns,
+            filter=_combine(partition_filters + row_filters))
+        return table.to_pandas()
+
+    @staticmethod
+    def _to_table(df: pd.DataFrame):
+        """
+        Convert movements to an Arrow table with the types every file
+        of the dataset shares, whatever the dtypes of the frame (e.g.
+        the categories and small integers of the low-memory mode).
+        """
+        import pyarrow as pa
+
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        fields = []
+        for field in table.schema:
+            field_type = field.type
+            if pa.types.is_dictionary(field_type):
+                field_type = field_type.value_type
+            if (pa.types.is_large_string(field_type)
+                    or pa.types.is_null(field_type)):
+                field_type = pa.string()
+            elif pa.types.is_integer(field_type):
+                field_type = pa.int64()
+            elif pa.types.is_timestamp(field_type):
+                field_type = pa.timestamp("ns")
+            fields.append(pa.field(field.name, field_type))
+        return table.cast(pa.schema(fields))
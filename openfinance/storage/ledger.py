@@ -0,0 +1,370 @@
+from __future__ import annotations
+
+import hashlib
+import io
+import logging
+import os
+import sqlite3
+import time
+from contextlib import contextmanager
+from datetime import date
+from typing import TYPE_CHECKING
+import openfinance.constants as ct
+
+if TYPE_CHECKING:
+    import pandas as pd
+
+
+logger = logging.getLogger(__name__)
+
+# Columns of a ledger entry read from the processed movements; the
+# other columns of the movements are kept as JSON in data
+INSTALLMENT_COLUMN = "current_installment_number"
+KEY_COLUMNS = ["txn_date", "amount", "description", INSTALLMENT_COLUMN,
+               "bank_name"]
+# Fingerprints looked up per query, below the SQLite variable limit
+LOOKUP_CHUNK_SIZE = 500
+
+
+def normalize_descriptions(descriptions: pd.Series) -> pd.Series:
+    """
+    Normalize movement descriptions for matching: accents removed,
+    upper case and runs of other characters than letters and digits
+    turned into single spaces, e.g. "Café  Juan-Valdez" -> "CAFE JUAN
+    VALDEZ". Missing descriptions are empty.
+    """
+    return (
+        descriptions.astype("string")
+        .fillna("")
+        .str.normalize("NFKD")
+        .str.encode("ascii", "ignore")
+        .str.decode("ascii")
+        .str.upper()
+        .str.replace(r"[^A-Z0-9]+", " ", regex=True)
+        .str.strip()
+        .astype(object))
+
+
+class Ledger:
+    """
+    Local ledger of the movements of every statement processed, so the
+    movements repeated by overlapping statements are stored once.
+
+    Each movement is keyed by a fingerprint of the account, the
+    transaction date, the amount, the normalized description and the
+    installment number. Identical movements of one statement, e.g. two
+    equal purchases on the same day, are told apart by their
+    occurrence, their position among the identical movements. Every
+    statement that contains them gives them the same occurrences, so
+    they are kept as distinct entries and still deduplicated.
+
+    The ledger is a SQLite database. Ingesting a statement only looks
+    up its own fingerprints in the primary key, so it takes time in
+    proportion to the statement and not to the history.
+    """
+
+    def __init__(self, ledger_path: str = ct.LEDGER_PATH):
+        """
+        Initialize the Ledger and create its table.
+
+        Args:
+            ledger_path (str): Path to the SQLite database
+        """
+        self.ledger_path = ledger_path
+        folder = os.path.dirname(ledger_path)
+        if folder:
+            os.makedirs(folder, exist_ok=True)
+        with self._connect() as connection:
+            # Readers do not block the ingestion of a statement
+            connection.execute("PRAGMA journal_mode = WAL")
+            connection.execute(
+                """
+                CREATE TABLE IF NOT EXISTS movements (
+                    fingerprint TEXT PRIMARY KEY,
+                    account_id TEXT NOT NULL,
+                    bank TEXT,
+                    txn_date TEXT NOT NULL,
+                    amount_cents INTEGER,
+                    description TEXT,
+                    normalized_description TEXT NOT NULL,
+                    installment INTEGER,
+                    occurrence INTEGER NOT NULL,
+                    data TEXT,
+                    source TEXT,
+                    first_seen REAL NOT NULL,
+                    last_seen REAL NOT NULL,
+                    seen_count INTEGER NOT NULL DEFAULT 1
+                ) WITHOUT ROWID
+                """
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS movements_account_date "
+                "ON movements (account_id, txn_date)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS movements_bank_date "
+                "ON movements (bank, txn_date)"
+            )
+            connection.execute(
+                "CREATE INDEX IF NOT EXISTS movements_source "
+                "ON movements (source)"
+            )
+
+    @staticmethod
+    def make_fingerprints(df: pd.DataFrame, account_id: str) -> pd.DataFrame:
+        """
+        Build the ledger keys of processed movements.
+
+        Args:
+            df (pd.DataFrame): Processed movements, with txn_date and
+                amount columns
+            account_id (str): Account or card the movements belong to
+
+        Returns:
+            pd.DataFrame: txn_date ("YYYY-MM-DD"), amount_cents,
+                normalized_description, installment, occurrence and
+                fingerprint columns, with the index of df
+
+        Raises:
+            ValueError: If a key column is missing or a date is invalid
+        """
+        import numpy as np
+        import pandas as pd
+
+        missing = [name for name in ("txn_date", "amount")
+                   if name not in df.columns]
+        if missing:
+            raise ValueError(f"Missing ledger columns: {missing}")
+
+        dates = pd.to_datetime(df["txn_date"], errors="coerce")
+        if dates.isna().any():
+            raise ValueError(
+                f"{int(dates.isna().sum())} movements without a valid "
+                f"txn_date")
+        amounts = pd.to_numeric(df["amount"], errors="coerce")
+        cents = pd.Series(
+            np.rint(amounts.to_numpy(dtype="float64") * 100),
+            index=df.index).astype("Int64")
+        descriptions = (
+            normalize_descriptions(df["description"])
+            if "description" in df.columns
+            else pd.Series("", index=df.index, dtype=object))
+        installments = (
+            pd.to_numeric(df[INSTALLMENT_COLUMN], errors="coerce")
+            .astype("Int64")
+            if INSTALLMENT_COLUMN in df.columns
+            else pd.Series(pd.NA, index=df.index, dtype="Int64"))
+
+        keys = pd.DataFrame({
+            "txn_date": dates.dt.strftime("%Y-%m-%d").astype(object),
+            "amount_cents": cents,
+            "normalized_description": descriptions,
+            "installment": installments,
+        }, index=df.index)
+        key_text = (
+            account_id + "|" + keys["txn_date"]
+            + "|" + cents.astype("string").fillna("").astype(object)
+            + "|" + descriptions
+            + "|" + installments.astype("string").fillna("").astype(object))
+        keys["occurrence"] = key_text.groupby(key_text).cumcount()
+        keys["fingerprint"] = [
+            hashlib.sha256(f"{text}|{occurrence}".encode("utf-8"))
+            .hexdigest()
+            for text, occurrence in zip(
+                key_text.tolist(), keys["occurrence"].tolist())]
+        return keys
+
+    def upsert(
+            self,
+            df: pd.DataFrame,
+            account_id: str,
+            bank: str = None,
+            source: str = None) -> dict:
+        """
+        Add the processed movements of a statement to the ledger. The
+        movements already in it, e.g. from an overlapping statement,
+        are not added again; their last_seen and seen_count are updated.
+
+        Args:
+            df (pd.DataFrame): Processed movements of the statement
+            account_id (str): Account or card of the statement
+            bank (str, optional): Bank of the statement. If None, it is
+                read from the bank_name column.
+            source (str, optional): Name of the statement, e.g. its file
+
+        Returns:
+            dict: Number of "inserted" movements and of "duplicates"
+                already in the ledger
+
+        Raises:
+            ValueError: If the account is empty, a key column is
+                missing or a date is invalid
+        """
+        if not account_id:
+            raise ValueError("The ledger needs the account of the movements")
+        keys = self.make_fingerprints(df, account_id)
+        if bank is None and "bank_name" in df.columns:
+            banks = df["bank_name"].astype(object).where(
+                df["bank_name"].notna(), None).tolist()
+        else:
+            banks = [bank] * len(df)
+        descriptions = (
+            df["description"].astype(object).where(
+                df["description"].notna(), None).tolist()
+            if "description" in df.columns else [None] * len(df))
+        extra = [name for name in df.columns if name not in KEY_COLUMNS]
+        data = (df[extra].to_json(
+                    orient="records", lines=True, date_format="iso")
+                .splitlines()
+                if extra and len(df) else [None] * len(df))
+
+        now = time.time()
+        rows = list(zip(
+            keys["fingerprint"].tolist(),
+            [account_id] * len(df),
+            banks,
+            keys["txn_date"].tolist(),
+            keys["amount_cents"].to_numpy(dtype=object, na_value=None)
+            .tolist(),
+            descriptions,
+            keys["normalized_description"].tolist(),
+            keys["installment"].to_numpy(dtype=object, na_value=None)
+            .tolist(),
+            keys["occurrence"].tolist(),
+            data,
+            [source] * len(df),
+            [now] * len(df),
+            [now] * len(df)))
+
+        with self._connect() as connection:
+            existing = self._existing(
+                connection, keys["fingerprint"].tolist())
+            connection.executemany(
+                """
+                INSERT INTO movements (
+                    fingerprint, account_id, bank, txn_date, amount_cents,
+                    description, normalized_description, installment,
+                    occurrence, data, source, first_seen, last_seen)
+                VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ON CONFLICT (fingerprint) DO UPDATE SET
+                    last_seen = excluded.last_seen,
+                    seen_count = seen_count + 1
+                """,
+                rows
+            )
+        counts = {"inserted": len(rows) - existing,
+                  "duplicates": existing}
+        logger.info(
+            f"Ledger: {counts['inserted']} new and {counts['duplicates']} "
+            f"repeated movements from {source or account_id}")
+        return counts
+
+    def read(
+            self,
+            account_id: str = None,
+            bank: str = None,
+            start: date | str = None,
+            end: date | str = None,
+            details: bool = False) -> pd.DataFrame:
+        """
+        Read movements from the ledger, in date order.
+
+        Args:
+            account_id (str, optional): Account to read
+            bank (str, optional): Bank to read
+            start (date | str, optional): First transaction date
+            end (date | str, optional): Last transaction date
+            details (bool): Add the other columns of the processed
+                movements, stored as JSON in data
+
+        Returns:
+            pd.DataFrame: Matching movements, with amount in units of
+                currency and txn_date as datetimes
+        """
+        import pandas as pd
+
+        conditions, parameters = [], []
+        for column, value in (("account_id", account_id), ("bank", bank)):
+            if value is not None:
+                conditions.append(f"{column} = ?")
+                parameters.append(value)
+        if start is not None:
+            conditions.append("txn_date >= ?")
+            parameters.append(pd.Timestamp(start).strftime("%Y-%m-%d"))
+        if end is not None:
+            conditions.append("txn_date <= ?")
+            parameters.append(pd.Timestamp(end).strftime("%Y-%m-%d"))
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+
+        with self._connect() as connection:
+            df = pd.read_sql_query(
+                f"SELECT * FROM movements {where} "
+                f"ORDER BY txn_date, account_id, occurrence, fingerprint",
+                connection, params=parameters)
+        df["txn_date"] = pd.to_datetime(df["txn_date"], format="%Y-%m-%d")
+        df.insert(df.columns.get_loc("amount_cents"), "amount",
+                  df["amount_cents"] / 100)
+        if details:
+            extra = pd.read_json(
+                _json_lines(df["data"]), orient="records", lines=True)
+            extra.index = df.index
+            df = df.join(extra[[name for name in extra.columns
+                                if name not in df.columns]])
+        return df.drop(columns=["data"])
+
+    def count(self, account_id: str = None) -> int:
+        """Return the number of movements, of one account or of all."""
+        with self._connect() as connection:
+            if account_id is None:
+                row = connection.execute(
+                    "SELECT COUNT(*) FROM movements").fetchone()
+            else:
+                row = connection.execute(
+                    "SELECT COUNT(*) FROM movements WHERE account_id = ?",
+                    (account_id,)).fetchone()
+        return row[0]
+
+    def remove_source(self, source: str) -> int:
+        """
+        Remove the movements first stored from a statement, e.g. to
+        ingest a corrected version of it.
+
+        Returns:
+            int: Number of movements removed
+        """
+        with self._connect() as connection:
+            removed = connection.execute(
+                "DELETE FROM movements WHERE source = ?", (source,)
+            ).rowcount
+        logger.info(f"Removed {removed} movements of {source} from ledger")
+        return removed
+
+    @staticmethod
+    def _existing(connection: sqlite3.Connection,
+                  fingerprints: list[str]) -> int:
+        """Count the fingerprints already in the ledger."""
+        existing = 0
+        for start in range(0, len(fingerprints), LOOKUP_CHUNK_SIZE):
+            chunk = fingerprints[start:start + LOOKUP_CHUNK_SIZE]
+            existing += connection.execute(
+                f"SELECT COUNT(*) FROM movements WHERE fingerprint IN "
+                f"({', '.join('?' * len(chunk))})",
+                chunk
+            ).fetchone()[0]
+        return existing
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per call, as in StatementIndex
+        connection = sqlite3.connect(self.ledger_path, timeout=30)
+        try:
+            with connection:
+                yield connection
+        finally:
+            connection.close()
+
+
+def _json_lines(data: pd.Series) -> io.StringIO:
+    """JSON lines of the data column, missing data as empty objects."""
+    return io.StringIO(
+        "\n".join(value if value else "{}" for value in data.tolist()))